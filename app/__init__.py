@@ -2,26 +2,47 @@ from flask import Flask
 
 from config import Config
 from .extensions import db, migrate, ma, jwt, limiter, cache, cors
+# registers the mmap:// rate limit storage before the limiter is configured
+from . import limits_storage
 
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    from app.api.utils import db_pool
+    db_pool.init_app(app)
+
     db.init_app(app)
     migrate.init_app(app, db)
+
+    from app.api.utils import request_timing
+    request_timing.init_app(app)
+
     ma.init_app(app)
     jwt.init_app(app)
     limiter.init_app(app)
     cache.init_app(app)
     cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS'] }})
     
+    from app.api.utils.passwords import password_hasher
+    password_hasher.init_app(app)
+
+    from app.api.utils import token_epochs
+    token_epochs.init_app(app)
+
     from commands import init_app
     init_app(app)
 
     from app.api import api
     api.init_app(app)
 
+    from app.api.utils import query_budget
+    query_budget.init_app(app)
+
+    from app.api.utils.historic_buffer import historic_buffer
+    historic_buffer.init_app(app)
+
     from app.api.errors import configure_error_handlers, configure_error_validation_handlers
     configure_error_validation_handlers(app)
 
@@ -1,6 +1,7 @@
 from flask_restx import Api
 
 from .namespaces import users_ns, auth_ns, words_ns, tags_ns, sets_words_ns, dashboard_ns, health_check_ns
+from .utils.json_output import output_json
 
 
 authorizations = {
@@ -20,6 +21,7 @@ api = Api(
     prefix='/api',
     authorizations=authorizations, security='jwt'
 )
+api.representations['application/json'] = output_json
 
 api.add_namespace(auth_ns)
 api.add_namespace(users_ns)
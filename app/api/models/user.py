@@ -1,6 +1,10 @@
-from passlib.apps import custom_app_context as pwd_context
+from sqlalchemy import update
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.extensions import db
+from app.api.utils.pagination import paginate
+from app.api.utils.passwords import password_hasher
 
 
 roles_users = db.Table('roles_users',
@@ -47,6 +51,8 @@ class UserModel(db.Model):
     password = db.Column(db.String(150), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     active = db.Column(db.Boolean, default=True)
+    # bumped to revoke every token issued to the user until then
+    token_epoch = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     roles = db.relationship('RoleModel',
         secondary=roles_users,
@@ -55,26 +61,59 @@ class UserModel(db.Model):
 
     @staticmethod
     def hash_password(password):
-        return pwd_context.hash(password)
+        return password_hasher.hash(password)
 
     @staticmethod
     def verify_password(password, hash_password):
-        return pwd_context.verify(password, hash_password)
+        valid, _ = password_hasher.verify_and_update(password, hash_password)
+        return valid
+
+    def check_password(self, password):
+        """ Verify the password and replace a hash of a deprecated
+        scheme or cost by a new one. The new hash is written in its own
+        transaction, a commit of the session would expire the user and
+        the roles loaded with it for the login """
+        valid, new_hash = password_hasher.verify_and_update(password, self.password)
+        if valid and new_hash:
+            with db.engine.begin() as connection:
+                # skipped when the password was changed since it was read
+                connection.execute(
+                    update(UserModel)
+                    .where(UserModel.id == self.id, UserModel.password == self.password)
+                    .values(password=new_hash)
+                )
+            set_committed_value(self, 'password', new_hash)
+        return valid
+
+    def revoke_tokens(self):
+        """ Tokens carry the epoch they were issued at, the older ones are rejected """
+        self.token_epoch = (self.token_epoch or 0) + 1
+
+    @classmethod
+    def authenticate(cls, email, password):
+        user = cls.get_user_by_email(email)
+        if user is None:
+            # same time spent whether the email exists or not
+            password_hasher.dummy_verify()
+            return None
+        if user.check_password(password):
+            return user
+        return None
 
     @classmethod
     def get_user_by_id(cls, user_id):
-        user = cls.query.filter_by(id=user_id).first()
+        user = cls.query.options(joinedload(cls.roles)).filter_by(id=user_id).first()
         return user
 
     @classmethod
     def get_user_by_email(cls, email):
-        user = cls.query.filter_by(email=email).first()
+        user = cls.query.options(joinedload(cls.roles)).filter_by(email=email).first()
         return user
 
     @classmethod
-    def get_all_users(cls):
-        users = cls.query.all()
-        return users
+    def get_users_page(cls, limit, after=None):
+        query = cls.query.options(selectinload(cls.roles))
+        return paginate(query, cls.id, limit, after)
 
     @classmethod
     def create_user(cls, data):
@@ -117,6 +156,7 @@ class UserModel(db.Model):
             user.roles.clear()
             user.roles = roles
 
+        user.revoke_tokens()
         db.session.commit()
         return user
 
@@ -125,6 +165,7 @@ class UserModel(db.Model):
         user = cls.get_user_by_id(user_id)
         new_password_hash = cls.hash_password(new_password)
         user.password = new_password_hash
+        user.revoke_tokens()
         db.session.commit()
         return user
 
@@ -1,9 +1,25 @@
 from datetime import datetime, timedelta
 from collections import defaultdict
 
-from sqlalchemy import func, case, extract
+from sqlalchemy import func, case, extract, insert, or_, cast, literal, null, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.dialects import postgresql, sqlite
 
 from app.extensions import db
+from app.api.utils.cache_versions import bump_version, user_dashboard_version_name
+from app.api.utils.date_window import get_date_window
+
+
+IN_CHUNK_SIZE = 500
+# 4 columns per row keeps a multi row INSERT under the SQLite 999 parameters limit
+HISTORIC_INSERT_CHUNK_SIZE = 200
+
+
+def _chunks(values, size=IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
 
 
 tags_words = db.Table('tags_words',
@@ -30,11 +46,6 @@ class TagModel(db.Model):
         tag = cls.query.filter_by(id=id_tage).first()
         return tag
 
-    @classmethod
-    def get_all_tags(cls):
-        tags = cls.query.all()
-        return tags
-
     @classmethod
     def create_tag(cls, data):
         tag = cls(name=data['name'])
@@ -60,18 +71,32 @@ class WordModel(db.Model):
     annotation = db.Column(db.Text)
     tags = db.relationship('TagModel',
         secondary=tags_words,
+        order_by='TagModel.id',
         backref=db.backref('words', lazy='dynamic')
     )
 
     @classmethod
     def get_word_by_id(cls, id_word):
-        word = cls.query.filter_by(id=id_word).first()
+        word = cls.query.options(joinedload(cls.tags)).filter_by(id=id_word).first()
         return word
 
     @classmethod
-    def get_all_words(cls):
-        words = cls.query.all()
-        return words
+    def iter_all_words(cls, batch_size=1000):
+        """ Stream all words with their tags, batch_size rows at a time.
+        Batches are read by id ranges, yield_per cannot be combined with
+        selectinload while do_orm_execute listeners are registered """
+        last_id = 0
+        while True:
+            words = db.session.scalars(
+                db.select(cls).options(selectinload(cls.tags))
+                .filter(cls.id > last_id)
+                .order_by(cls.id)
+                .limit(batch_size)
+            ).all()
+            if not words:
+                return
+            yield from words
+            last_id = words[-1].id
 
     @classmethod
     def create_word(cls, data):
@@ -91,6 +116,96 @@ class WordModel(db.Model):
         db.session.commit()
         return word
 
+    @classmethod
+    def import_words(cls, rows):
+        """ Bulk insert (index, row) pairs of validated rows with name,
+        translation, annotation and tags as ids or names. Rows whose name
+        already exists or that reference unknown tags are skipped and
+        reported by their index. Returns the number of created words and
+        the list of row errors """
+        errors = []
+        accepted = {}
+        for index, row in rows:
+            if row['name'] in accepted:
+                errors.append({'row': index, 'name': row['name'],
+                    'message': 'duplicated name in the import'})
+            else:
+                accepted[row['name']] = (index, row)
+
+        for names in _chunks(accepted):
+            existing = db.session.execute(
+                db.select(cls.name).filter(cls.name.in_(names))
+            ).scalars()
+            for name in existing:
+                index, _ = accepted.pop(name)
+                errors.append({'row': index, 'name': name,
+                    'message': 'this word already exists'})
+
+        # resolves every tag id and name of the batch in a single query
+        tag_ids = {tag for _, row in accepted.values() for tag in row['tags'] if isinstance(tag, int)}
+        tag_names = {tag for _, row in accepted.values() for tag in row['tags'] if isinstance(tag, str)}
+        tags_by_key = {}
+        if tag_ids or tag_names:
+            tags = db.session.execute(
+                db.select(TagModel.id, TagModel.name).filter(
+                    or_(TagModel.id.in_(tag_ids), TagModel.name.in_(tag_names))
+                )
+            ).all()
+            for tag in tags:
+                tags_by_key[tag.id] = tag.id
+                tags_by_key[tag.name] = tag.id
+
+        word_rows = []
+        word_tags = {}
+        for name, (index, row) in list(accepted.items()):
+            unknown = [tag for tag in row['tags'] if tag not in tags_by_key]
+            if unknown:
+                accepted.pop(name)
+                errors.append({'row': index, 'name': name,
+                    'message': f"Tags {', '.join(map(str, unknown))} do not exist"})
+                continue
+            word_rows.append({
+                'name': name,
+                'translation': row['translation'],
+                'annotation': row.get('annotation'),
+            })
+            word_tags[name] = {tags_by_key[tag] for tag in row['tags']}
+
+        try:
+            created = cls._insert_words(word_rows, word_tags)
+            db.session.commit()
+        except IntegrityError:
+            # a concurrent insert took some names, retries row by row
+            db.session.rollback()
+            created = 0
+            for word_row in word_rows:
+                try:
+                    with db.session.begin_nested():
+                        created += cls._insert_words([word_row], word_tags)
+                except IntegrityError:
+                    index, _ = accepted[word_row['name']]
+                    errors.append({'row': index, 'name': word_row['name'],
+                        'message': 'this word already exists'})
+            db.session.commit()
+
+        errors.sort(key=lambda error: error['row'])
+        return created, errors
+
+    @classmethod
+    def _insert_words(cls, word_rows, word_tags):
+        if not word_rows:
+            return 0
+        inserted = db.session.execute(
+            insert(cls).returning(cls.id, cls.name), word_rows
+        ).all()
+        tag_rows = [
+            {'word_id': word.id, 'tag_id': tag_id}
+            for word in inserted for tag_id in word_tags[word.name]
+        ]
+        if tag_rows:
+            db.session.execute(tags_words.insert(), tag_rows)
+        return len(inserted)
+
     @classmethod
     def update_word(cls, id_word, data):
         word = cls.get_word_by_id(id_word)
@@ -141,22 +256,20 @@ class SetModel(db.Model):
 
     words = db.relationship('WordModel',
         secondary=sets_words,
+        order_by='WordModel.id',
         backref=db.backref('sets', lazy='dynamic')
     )
 
     @classmethod
     def get_set_by_id(cls, id_set):
-        set_words = cls.query.filter_by(id=id_set).first()
+        set_words = cls.query.options(joinedload(cls.words)).filter_by(id=id_set).first()
         return set_words
 
-    @classmethod
-    def get_all_sets(cls):
-        sets = cls.query.all()
-        return sets
-
     @classmethod
     def get_words_by_set_id(cls, set_id):
-        words = db.session.query(WordModel).join(
+        words = db.session.query(WordModel).options(
+            selectinload(WordModel.tags)
+        ).join(
             sets_words, (WordModel.id == sets_words.c.word_id)
         ).filter(
             sets_words.c.set_id == set_id
@@ -205,12 +318,51 @@ class SetModel(db.Model):
         return '<Set %r>' % self.name
 
 
+def _upsert_counters(model, rows, index_elements, counters, replace=()):
+    """ Insert rows or add their counters to the existing ones,
+    columns in replace are overwritten with the new values """
+    if not rows:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(model)
+        set_ = {
+            counter: getattr(model, counter) + getattr(stmt.excluded, counter)
+            for counter in counters
+        }
+        set_.update({column: getattr(stmt.excluded, column) for column in replace})
+        stmt = stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+        db.session.execute(stmt, rows)
+        return
+
+    for row in rows:
+        obj = db.session.get(model, [row[key] for key in index_elements])
+        if obj is None:
+            db.session.add(model(**row))
+        else:
+            for counter in counters:
+                setattr(obj, counter, getattr(obj, counter) + row[counter])
+            for column in replace:
+                setattr(obj, column, row[column])
+
+
+def _hit_type_counts(row):
+    result = []
+    if row is not None:
+        for hit_type in ('errors', 'hits'):
+            count = getattr(row, hit_type)
+            if count:
+                result.append({'hit_type': hit_type, 'count': count})
+    return result
+
+
 class HistoricHitsModel(db.Model):
     __tablename__ = "history_hits"
-    today = datetime.utcnow().date()
-    yesterday = today - timedelta(days=1)
-    thirty_days_ago = yesterday - timedelta(days=30)
-    start_date_90days = yesterday - timedelta(days=90)
+    __table_args__ = (
+        db.Index('ix_history_hits_id_user_date_hit', 'id_user', 'date', 'hit'),
+    )
 
     id = db.Column(db.Integer(), primary_key=True)
     id_user = db.Column(db.Integer,
@@ -223,114 +375,464 @@ class HistoricHitsModel(db.Model):
     date = db.Column(db.Date, nullable=False, default=datetime.now)
 
 
+    @classmethod
+    def build_historics(cls, data, id_user):
+        """ Rows to insert from the validated payload of a user """
+        date = get_date_window().today
+        return [
+            {
+                'id_word': row['id_word'],
+                'hit': row['hit'],
+                'id_user': id_user,
+                'date': date,
+            }
+            for row in data
+        ]
+
     @classmethod
     def create_historics(cls, data, id_user):
-        historics = []
-        for row in data:
-            historics.append(
-                cls(
-                    id_word=row['id_word'],
-                    hit=row['hit'],
-                    id_user=id_user,
-                )
-            )
+        historics = cls.build_historics(data, id_user)
+        cls.bulk_create_historics(historics)
+        return historics
 
-        db.session.add_all(historics)
+    @classmethod
+    def bulk_create_historics(cls, historics):
+        """ Insert rows of any users with multi row INSERTs and update the
+        rollups in the same transaction """
+        for chunk in _chunks(historics, HISTORIC_INSERT_CHUNK_SIZE):
+            db.session.execute(insert(cls).values(chunk))
+        UserDailyStatsModel.add_historics(historics)
+        UserWordStatsModel.add_historics(historics)
+        ReviewScheduleModel.add_historics(historics)
         db.session.commit()
-        return historics
+        # invalidates every cached dashboard entry of the users at once
+        for id_user in {historic['id_user'] for historic in historics}:
+            bump_version(user_dashboard_version_name(id_user))
 
     @classmethod
-    def get_historic_hits_by_user(cls, id_user):
+    def iter_historics_by_user(cls, id_user, batch_size=5000):
+        """ Stream the user history as rows, batch_size rows at a time """
+        query = db.select(
+            cls.id, cls.id_word, cls.hit, cls.date
+        ).filter(
+            cls.id_user == id_user
+        ).order_by(cls.id).execution_options(yield_per=batch_size)
+        yield from db.session.execute(query)
+
+    @classmethod
+    def get_historic_hits_by_user(cls, id_user, window=None):
+        window = window or get_date_window()
+        stats = UserDailyStatsModel
         result = db.session.query(
-            case(
-                (cls.hit == True, 'hits'),
-                else_='errors'
-            ).label('hit_type'),
-            func.count().label('count')
+            func.coalesce(func.sum(stats.hits), 0).label('hits'),
+            func.coalesce(func.sum(stats.errors), 0).label('errors')
             ).filter(
-                cls.date >= cls.thirty_days_ago,
-                cls.date <= cls.yesterday,
-                cls.id_user == id_user
-        ).group_by(cls.hit).all()
-
-        data = {'hits': 0, 'errors':0}
-        for row in result:
-            if row.hit_type == 'errors':
-                data['errors'] = row.count
-            else:
-                data['hits'] = row.count
+                stats.date >= window.thirty_days_ago,
+                stats.date <= window.yesterday,
+                stats.id_user == id_user
+        ).one()
+
+        data = {'hits': result.hits, 'errors': result.errors}
 
         return data
 
     @classmethod
     def get_historic_by_day_by_user(cls, id_user, date):
-        result = db.session.query(
-            case(
-                (cls.hit == True, 'hits'),
-                else_='errors'
-            ).label('hit_type'),
-            db.func.count().label('count')).filter(
-            cls.date == date,
-            cls.id_user == id_user
-        ).group_by(cls.hit).all()
-        return result
+        stats = UserDailyStatsModel
+        row = db.session.query(stats.hits, stats.errors).filter(
+            stats.date == date,
+            stats.id_user == id_user
+        ).first()
+
+        return _hit_type_counts(row)
 
     @classmethod
-    def get_historic_by_user_top10_words_error(cls, id_user):
+    def get_historic_by_user_top10_words_error(cls, id_user, limit=10):
+        stats = UserWordStatsModel
         results = db.session.query(
             WordModel.name.label('word'),
-            func.count().label('count')
+            stats.errors.label('count')
         ).join(
-            cls,
-            WordModel.id == cls.id_word
+            WordModel,
+            WordModel.id == stats.id_word
         ).filter(
-            cls.id_user == id_user,
-            cls.hit == False,
-            cls.date <= cls.yesterday
-        ).group_by(
-            WordModel.name
+            stats.id_user == id_user,
+            stats.errors > 0
         ).order_by(
-            func.count().desc()
-        ).limit(10).all()
+            stats.errors.desc(),
+            WordModel.name
+        ).limit(limit).all()
 
         return results
 
     @classmethod
-    def get_historic_90days_by_user(cls, id_user):
+    def get_historic_90days_by_user(cls, id_user, window=None):
+        window = window or get_date_window()
+        stats = UserDailyStatsModel
         result = (
-            db.session.query(
-                case(
-                    (cls.hit == True, 'hits'),
-                    else_='errors'
-                ).label('hit_type'),
-                cls.date, 
-                db.func.count().label('count')
-            )
+            db.session.query(stats.date, stats.hits, stats.errors)
             .filter(
-                cls.id_user == id_user,
-                cls.date >= cls.start_date_90days,
-                cls.date <= cls.yesterday
+                stats.id_user == id_user,
+                stats.date >= window.start_date_90days,
+                stats.date <= window.yesterday
             )
-            .group_by(cls.date,cls.hit)
-            .order_by(cls.date.asc())
+            .order_by(stats.date.asc())
             .all()
             )
 
-        counts_by_date = defaultdict(dict)
+        output = [
+            {'date': row.date, 'hits': row.hits, 'errors': row.errors}
+            for row in result
+        ]
 
-        for row in result:
-            date = row.date
-            hit_type = row.hit_type
-            count = row.count
-            
-            if date not in counts_by_date:
-                counts_by_date[date] = {'hits': 0, 'errors': 0}
-            
-            counts_by_date[date][hit_type] = count
+        return output
 
-        output = [{'date': date, **counts} for date, counts in counts_by_date.items()]
+    @classmethod
+    def get_dashboard_summary(cls, id_user, date, limit=10, window=None):
+        """ The four dashboard widgets in a single UNION ALL query over the
+        rollups, the last 90 days of the user are read once through a CTE """
+        window = window or get_date_window()
+        stats = UserDailyStatsModel
+        word_stats = UserWordStatsModel
+        no_date = cast(null(), db.Date)
+        no_word = cast(null(), db.String)
+
+        days = db.select(stats.date, stats.hits, stats.errors).filter(
+            stats.id_user == id_user,
+            stats.date >= window.start_date_90days,
+            stats.date <= window.yesterday
+        ).cte('days')
+
+        total = db.select(
+            literal('total').label('section'),
+            no_date.label('date'),
+            no_word.label('word'),
+            func.coalesce(func.sum(days.c.hits), 0).label('hits'),
+            func.coalesce(func.sum(days.c.errors), 0).label('errors')
+        ).filter(days.c.date >= window.thirty_days_ago)
+
+        day = db.select(
+            literal('day'), stats.date, no_word, stats.hits, stats.errors
+        ).filter(
+            stats.id_user == id_user,
+            stats.date == date
+        )
 
-        return output
+        # ORDER BY and LIMIT of a compound member must be in a subquery,
+        # the rank in the hits column keeps the order of the top10 widget
+        top_order = (word_stats.errors.desc(), WordModel.name)
+        top_words = db.select(
+            WordModel.name,
+            word_stats.errors,
+            func.row_number().over(order_by=top_order).label('rank')
+        ).join(
+            WordModel,
+            WordModel.id == word_stats.id_word
+        ).filter(
+            word_stats.id_user == id_user,
+            word_stats.errors > 0
+        ).order_by(*top_order).limit(limit).subquery()
+        top = db.select(
+            literal('top'), no_date, top_words.c.name, top_words.c.rank, top_words.c.errors
+        )
+
+        history = db.select(
+            literal('history'), days.c.date, no_word, days.c.hits, days.c.errors
+        )
+
+        rows = db.session.execute(union_all(total, day, top, history)).all()
+
+        summary = {
+            'total_hits_last_30days': {'hits': 0, 'errors': 0},
+            'historic_by_day': [],
+            'top10_wrong_words': [],
+            'historic_90days': [],
+        }
+        top_words_rows = []
+        for row in rows:
+            if row.section == 'total':
+                summary['total_hits_last_30days'] = {'hits': row.hits, 'errors': row.errors}
+            elif row.section == 'day':
+                summary['historic_by_day'] = _hit_type_counts(row)
+            elif row.section == 'top':
+                top_words_rows.append(row)
+            else:
+                summary['historic_90days'].append(
+                    {'date': row.date, 'hits': row.hits, 'errors': row.errors}
+                )
+
+        # a compound select keeps no order, sort as the single widgets do
+        summary['top10_wrong_words'] = [
+            {'word': row.word, 'count': row.errors}
+            for row in sorted(top_words_rows, key=lambda row: row.hits)
+        ]
+        summary['historic_90days'].sort(key=lambda day: day['date'])
+        return summary
+
+    def __repr__(self):
+        return '<Historic %r>' % self.id_user
+
+
+class UserDailyStatsModel(db.Model):
+    __tablename__ = "user_daily_stats"
+
+    id_user = db.Column(db.Integer,
+        db.ForeignKey('users.id', name='fk_user_daily_stats_id_user', ondelete="CASCADE"),
+        primary_key=True
+    )
+    date = db.Column(db.Date, primary_key=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    errors = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def add_historics(cls, historics):
+        counts = defaultdict(lambda: {'hits': 0, 'errors': 0})
+        for historic in historics:
+            key = (historic['id_user'], historic['date'])
+            counts[key]['hits' if historic['hit'] else 'errors'] += 1
+
+        rows = [
+            {'id_user': id_user, 'date': date, **count}
+            for (id_user, date), count in counts.items()
+        ]
+        _upsert_counters(cls, rows, ['id_user', 'date'], ['hits', 'errors'])
+
+    @classmethod
+    def rebuild(cls, id_user=None):
+        """ Recalculate the rollup from history_hits """
+        historic = HistoricHitsModel
+        delete_query = cls.query
+        select_query = db.select(
+            historic.id_user,
+            historic.date,
+            func.sum(case((historic.hit == True, 1), else_=0)),
+            func.sum(case((historic.hit == True, 0), else_=1)),
+        ).group_by(historic.id_user, historic.date)
+
+        if id_user is not None:
+            delete_query = delete_query.filter(cls.id_user == id_user)
+            select_query = select_query.filter(historic.id_user == id_user)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.execute(
+            insert(cls).from_select(['id_user', 'date', 'hits', 'errors'], select_query)
+        )
+        db.session.commit()
+
+    def __repr__(self):
+        return '<UserDailyStats %r %r>' % (self.id_user, self.date)
+
+
+class UserWordStatsModel(db.Model):
+    __tablename__ = "user_word_stats"
+    __table_args__ = (
+        db.Index('ix_user_word_stats_id_user_errors', 'id_user', 'errors'),
+    )
+
+    id_user = db.Column(db.Integer,
+        db.ForeignKey('users.id', name='fk_user_word_stats_id_user', ondelete="CASCADE"),
+        primary_key=True
+    )
+    id_word = db.Column(db.Integer,
+        db.ForeignKey('words.id', name='fk_user_word_stats_id_word', ondelete="CASCADE"),
+        primary_key=True
+    )
+    errors = db.Column(db.Integer, nullable=False, default=0)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    last_seen = db.Column(db.Date, nullable=False)
+
+    @classmethod
+    def add_historics(cls, historics):
+        counts = {}
+        for historic in historics:
+            key = (historic['id_user'], historic['id_word'])
+            if key not in counts:
+                counts[key] = {'hits': 0, 'errors': 0, 'last_seen': historic['date']}
+            counts[key]['hits' if historic['hit'] else 'errors'] += 1
+            counts[key]['last_seen'] = max(counts[key]['last_seen'], historic['date'])
+
+        rows = [
+            {'id_user': id_user, 'id_word': id_word, **count}
+            for (id_user, id_word), count in counts.items()
+        ]
+        _upsert_counters(
+            cls, rows, ['id_user', 'id_word'], ['hits', 'errors'], replace=['last_seen']
+        )
+
+    @classmethod
+    def rebuild(cls, id_user=None):
+        """ Recalculate the counters from history_hits """
+        historic = HistoricHitsModel
+        delete_query = cls.query
+        select_query = db.select(
+            historic.id_user,
+            historic.id_word,
+            func.sum(case((historic.hit == True, 0), else_=1)),
+            func.sum(case((historic.hit == True, 1), else_=0)),
+            func.max(historic.date),
+        ).group_by(historic.id_user, historic.id_word)
+
+        if id_user is not None:
+            delete_query = delete_query.filter(cls.id_user == id_user)
+            select_query = select_query.filter(historic.id_user == id_user)
+
+        delete_query.delete(synchronize_session=False)
+        db.session.execute(
+            insert(cls).from_select(
+                ['id_user', 'id_word', 'errors', 'hits', 'last_seen'], select_query
+            )
+        )
+        db.session.commit()
+
+    def __repr__(self):
+        return '<UserWordStats %r %r>' % (self.id_user, self.id_word)
+
+
+SM2_INITIAL_EASE = 2.5
+SM2_MIN_EASE = 1.3
+# days, the dates of long runs of hits stay far from date.max
+SM2_MAX_INTERVAL = 365
+# answers are only right or wrong, graded on the SM-2 0-5 quality scale
+SM2_QUALITY_HIT = 4
+SM2_QUALITY_ERROR = 1
+
+
+def _sm2_review(repetitions, interval, ease, hit):
+    """ Next (repetitions, interval in days, ease) after an answer,
+    a wrong answer restarts the word and keeps it due the same day """
+    quality = SM2_QUALITY_HIT if hit else SM2_QUALITY_ERROR
+    if quality < 3:
+        repetitions, interval = 0, 0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1
+        elif repetitions == 2:
+            interval = 6
+        else:
+            interval = min(round(interval * ease), SM2_MAX_INTERVAL)
+    ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return repetitions, interval, max(ease, SM2_MIN_EASE)
+
+
+class ReviewScheduleModel(db.Model):
+    """ SM-2 spaced repetition state of each word answered by a user """
+    __tablename__ = "review_schedules"
+    __table_args__ = (
+        db.Index('ix_review_schedules_id_user_due_at', 'id_user', 'due_at'),
+    )
+
+    id_user = db.Column(db.Integer,
+        db.ForeignKey('users.id', name='fk_review_schedules_id_user', ondelete="CASCADE"),
+        primary_key=True
+    )
+    id_word = db.Column(db.Integer,
+        db.ForeignKey('words.id', name='fk_review_schedules_id_word', ondelete="CASCADE"),
+        primary_key=True
+    )
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    interval = db.Column(db.Integer, nullable=False, default=0)
+    ease = db.Column(db.Float, nullable=False, default=SM2_INITIAL_EASE)
+    due_at = db.Column(db.Date, nullable=False)
+    last_review = db.Column(db.Date, nullable=False)
+
+    @staticmethod
+    def _apply_reviews(states, historics):
+        """ Replay the answers in order over states {(id_user, id_word):
+        (repetitions, interval, ease, due_at)}, returns the rows to write.
+        A hit before the word is due leaves its schedule as it is, an
+        error restarts the word whenever it comes """
+        rows = {}
+        for historic in historics:
+            key = (historic['id_user'], historic['id_word'])
+            repetitions, interval, ease, due_at = states.get(key, (0, 0, SM2_INITIAL_EASE, None))
+            if due_at is None or historic['date'] >= due_at or not historic['hit']:
+                repetitions, interval, ease = _sm2_review(repetitions, interval, ease, historic['hit'])
+                due_at = historic['date'] + timedelta(days=interval)
+            states[key] = (repetitions, interval, ease, due_at)
+            rows[key] = {
+                'id_user': key[0],
+                'id_word': key[1],
+                'repetitions': repetitions,
+                'interval': interval,
+                'ease': ease,
+                'due_at': due_at,
+                'last_review': historic['date'],
+            }
+        return list(rows.values())
+
+    @classmethod
+    def _get_states(cls, keys):
+        word_ids_by_user = defaultdict(set)
+        for id_user, id_word in keys:
+            word_ids_by_user[id_user].add(id_word)
+
+        states = {}
+        for id_user, word_ids in word_ids_by_user.items():
+            for chunk in _chunks(word_ids):
+                rows = db.session.execute(
+                    db.select(cls.id_word, cls.repetitions, cls.interval, cls.ease, cls.due_at)
+                    .filter(cls.id_user == id_user, cls.id_word.in_(chunk))
+                )
+                for id_word, *state in rows:
+                    states[(id_user, id_word)] = tuple(state)
+        return states
+
+    @classmethod
+    def add_historics(cls, historics):
+        keys = {(historic['id_user'], historic['id_word']) for historic in historics}
+        rows = cls._apply_reviews(cls._get_states(keys), historics)
+        _upsert_counters(
+            cls, rows, ['id_user', 'id_word'], [],
+            replace=['repetitions', 'interval', 'ease', 'due_at', 'last_review']
+        )
+
+    @classmethod
+    def get_due_words(cls, id_user, limit, window=None):
+        """ Words due until today, read in due_at order from the
+        (id_user, due_at) index whatever the size of the history """
+        window = window or get_date_window()
+        results = db.session.query(
+            cls.id_word,
+            WordModel.name.label('word'),
+            WordModel.translation,
+            cls.due_at,
+            cls.interval,
+            cls.ease
+        ).join(
+            WordModel,
+            WordModel.id == cls.id_word
+        ).filter(
+            cls.id_user == id_user,
+            cls.due_at <= window.today
+        ).order_by(
+            cls.due_at.asc()
+        ).limit(limit).all()
+
+        return results
+
+    @classmethod
+    def rebuild(cls, id_user=None):
+        """ Replay history_hits to recalculate the schedules """
+        historic = HistoricHitsModel
+        delete_query = cls.query
+        select_query = db.select(
+            historic.id_user, historic.id_word, historic.hit, historic.date
+        ).order_by(historic.id)
+
+        if id_user is not None:
+            delete_query = delete_query.filter(cls.id_user == id_user)
+            select_query = select_query.filter(historic.id_user == id_user)
+
+        delete_query.delete(synchronize_session=False)
+        historics = (
+            row._asdict()
+            for row in db.session.execute(select_query.execution_options(yield_per=5000))
+        )
+        rows = cls._apply_reviews({}, historics)
+        for chunk in _chunks(rows):
+            db.session.execute(insert(cls), chunk)
+        db.session.commit()
 
     def __repr__(self):
-        return '<Historic %r>' % self.id_user
\ No newline at end of file
+        return '<ReviewSchedule %r %r>' % (self.id_user, self.id_word)
@@ -2,6 +2,7 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, verify_jwt_in_request
 
 from app.api.models.user import UserModel
+from app.api.utils.passwords import PasswordHashBusy
 from app.extensions import limiter
 
 
@@ -21,19 +22,25 @@ class Login(Resource):
         data = auth_ns.payload
         email = data['email']
         password = data['password']
-        user = UserModel.get_user_by_email(email)
+        try:
+            user = UserModel.authenticate(email, password)
+        except PasswordHashBusy:
+            return {'message': 'Too many logins, try again later'}, 503, {'Retry-After': '1'}
         if user:
-            if user.verify_password(password, user.password):
-                access_token = create_access_token(
-                    identity=user.id,
-                    additional_claims={
-                        "name": user.name.split(' ')[0],
-                        "is_admin": user.is_admin,
-                        "roles": [role.name for role in user.roles]
-                    },
-                )
-                refresh_token = create_refresh_token(identity=user.id)
-                return {'access_token': access_token, 'refresh_token': refresh_token}
+            access_token = create_access_token(
+                identity=user.id,
+                additional_claims={
+                    "name": user.name.split(' ')[0],
+                    "is_admin": user.is_admin,
+                    "roles": [role.name for role in user.roles],
+                    "epoch": user.token_epoch,
+                },
+            )
+            refresh_token = create_refresh_token(
+                identity=user.id,
+                additional_claims={"epoch": user.token_epoch},
+            )
+            return {'access_token': access_token, 'refresh_token': refresh_token}
         return {'message': 'Invalid credentials'}, 401
 
 
@@ -44,13 +51,15 @@ class Refresh(Resource):
     def post(self):
         user_id = get_jwt_identity()
         user = UserModel.get_user_by_id(user_id)
-        if user:
-            access_token = create_access_token(
-                identity=user.id,
-                additional_claims={
-                    "name": user.name.split(' ')[0],
-                    "is_admin": user.is_admin,
-                    "roles": [role.name for role in user.roles]
-                },
-            )
+        if not user:
+            return {'message': 'User not found'}, 401
+        access_token = create_access_token(
+            identity=user.id,
+            additional_claims={
+                "name": user.name.split(' ')[0],
+                "is_admin": user.is_admin,
+                "roles": [role.name for role in user.roles],
+                "epoch": user.token_epoch,
+            },
+        )
         return {'access_token': access_token}
\ No newline at end of file
@@ -1,11 +1,18 @@
+from datetime import date as date_type
+
 from flask_restx import Resource, fields, Namespace
 from marshmallow import ValidationError
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask import request
+from flask import request, Response, stream_with_context
 
-from app.api.models.word import HistoricHitsModel
+from app.api.models.word import HistoricHitsModel, ReviewScheduleModel
 from app.api.schemas.historic import HistoricSchema
-from app.extensions import limiter, cache
+from app.api.utils.json_output import encode
+from app.api.utils.cache_versions import get_version, user_dashboard_version_name
+from app.api.utils.date_window import get_date_window, cached_until_next_day
+from app.api.utils.pagination import get_limit_arg
+from app.api.utils.historic_buffer import historic_buffer, HistoricBufferFull, HistoricFlushError
+from app.extensions import limiter
 
 
 dashboard_ns = Namespace('dashboard', description='Dashboard related operations')
@@ -43,10 +50,36 @@ historic_90days_by_user = dashboard_ns.model('HistoricHitsModel', {
     'errors': fields.Integer
 })
 
+dashboard_summary_model = dashboard_ns.model('DashboardSummaryModel', {
+    'total_hits_last_30days': fields.Nested(historic_hits_model),
+    'historic_by_day': fields.List(fields.Nested(historic_hits_and_errors_by_day_model)),
+    'top10_wrong_words': fields.List(fields.Nested(top10_wrong_words_user_model)),
+    'historic_90days': fields.List(fields.Nested(historic_90days_by_user)),
+})
+
+due_word_model = dashboard_ns.model('DueWordModel', {
+    'id_word': fields.Integer,
+    'word': fields.String,
+    'translation': fields.String,
+    'due_at': fields.Date,
+    'interval': fields.Integer,
+    'ease': fields.Float,
+})
+
+TOP_WRONG_WORDS_MAX_LIMIT = 100
+DUE_WORDS_MAX_LIMIT = 100
+
+
+def get_top_words_limit():
+    return get_limit_arg('limit', 10, TOP_WRONG_WORDS_MAX_LIMIT)
+
+
 def get_user_cache_key():
     user_id = get_jwt_identity()
-    route_path = request.path
-    return f'user_{user_id}_{route_path}'
+    version = get_version(user_dashboard_version_name(user_id))
+    today = get_date_window().today
+    route_path = request.full_path
+    return f'user_{user_id}_v{version}_{today}_{route_path}'
 
 
 @dashboard_ns.route('/create_historic')
@@ -57,6 +90,8 @@ class Historic(Resource):
     @dashboard_ns.doc('create_historic')
     @dashboard_ns.expect(historic_list_model)
     @dashboard_ns.response(201, 'historic created')
+    @dashboard_ns.response(202, 'historic buffered, HISTORIC_INGESTION=buffered with async ack')
+    @dashboard_ns.response(503, 'historic buffer full')
     def post(self):
         '''Create historics'''
         user_id = get_jwt_identity()
@@ -68,9 +103,23 @@ class Historic(Resource):
         if errors:
            raise ValidationError(errors)
 
-        data = HistoricHitsModel.create_historics(data['historics'], user_id)
-        data_serialized = historic_schema.dump(data)
-        return data_serialized, 201
+        # dumps the payload, the created rows would be reloaded one by one after the commit
+        data_serialized = historic_schema.dump(data['historics'])
+
+        if not historic_buffer.enabled:
+            HistoricHitsModel.create_historics(data['historics'], user_id)
+            return data_serialized, 201
+
+        historics = HistoricHitsModel.build_historics(data['historics'], user_id)
+        try:
+            historic_buffer.submit(historics)
+        except HistoricBufferFull:
+            return {'message': 'too many historics waiting, try again later'}, 503, {'Retry-After': '1'}
+        except HistoricFlushError:
+            return {'message': 'Database error'}, 500
+
+        # with async acknowledgement the rows are only buffered
+        return data_serialized, 201 if historic_buffer.sync_ack else 202
 
 
 @dashboard_ns.route('/total_hits_last_30days')
@@ -78,7 +127,7 @@ class HistoricHitsUser(Resource):
 
     @jwt_required()
     @limiter.limit("24 per day")
-    @cache.cached(timeout=3600, key_prefix=get_user_cache_key)
+    @cached_until_next_day(get_user_cache_key)
     @dashboard_ns.doc('get_historic_hits')
     @dashboard_ns.marshal_with(historic_hits_model)
     def get(self):
@@ -93,7 +142,7 @@ class HistoricByDayUser(Resource):
     
     @jwt_required()
     @limiter.limit("24 per day")
-    @cache.cached(timeout=3600, key_prefix=get_user_cache_key)
+    @cached_until_next_day(get_user_cache_key)
     @dashboard_ns.doc('get_historic_hits_and_errors_by_day')
     @dashboard_ns.marshal_with(historic_hits_and_errors_by_day_model)
     def get(self, date):
@@ -108,15 +157,17 @@ class HistoricByDayUser(Resource):
 class Top10WrongWordsUser(Resource):
 
     @jwt_required()
-    @cache.cached(timeout=3600, key_prefix=get_user_cache_key)
+    @cached_until_next_day(get_user_cache_key)
     @limiter.limit("24 per day")
     @dashboard_ns.marshal_with(top10_wrong_words_user_model)
-    @dashboard_ns.doc('get_top10_wrong_words_by_user')
+    @dashboard_ns.doc('get_top10_wrong_words_by_user',
+        params={'limit': f'number of words, max {TOP_WRONG_WORDS_MAX_LIMIT} (default 10)'})
     def get(self):
         '''Get top 10 wrong words by user'''
         user_id = get_jwt_identity()
+        limit = get_top_words_limit()
         data = HistoricHitsModel.\
-            get_historic_by_user_top10_words_error(user_id)
+            get_historic_by_user_top10_words_error(user_id, limit)
         return data
 
 
@@ -124,7 +175,7 @@ class Top10WrongWordsUser(Resource):
 class Historic90daysUser(Resource):
 
     @jwt_required()
-    @cache.cached(timeout=3600, key_prefix=get_user_cache_key)
+    @cached_until_next_day(get_user_cache_key)
     @limiter.limit("24 per day")
     @dashboard_ns.doc('get_historic_90days_by_user')
     @dashboard_ns.marshal_with(historic_90days_by_user)
@@ -134,3 +185,68 @@ class Historic90daysUser(Resource):
         data = HistoricHitsModel.get_historic_90days_by_user(user_id)
         return data
 
+
+@dashboard_ns.route('/summary')
+class DashboardSummary(Resource):
+
+    @jwt_required()
+    @limiter.limit("24 per day")
+    @cached_until_next_day(get_user_cache_key)
+    @dashboard_ns.marshal_with(dashboard_summary_model)
+    @dashboard_ns.doc('get_dashboard_summary', params={
+        'date': 'day of historic_by_day as YYYY-MM-DD (default today)',
+        'limit': f'number of wrong words, max {TOP_WRONG_WORDS_MAX_LIMIT} (default 10)',
+    })
+    def get(self):
+        '''Get every dashboard widget of the user in a single request'''
+        user_id = get_jwt_identity()
+        window = get_date_window()
+        day = request.args.get('date')
+        try:
+            day = date_type.fromisoformat(day) if day else window.today
+        except ValueError:
+            raise ValidationError({'date': ['date must be formatted as YYYY-MM-DD']})
+
+        data = HistoricHitsModel.get_dashboard_summary(
+            user_id, day, get_top_words_limit(), window
+        )
+        return data
+
+
+@dashboard_ns.route('/due')
+class DueWords(Resource):
+
+    @jwt_required()
+    @cached_until_next_day(get_user_cache_key)
+    @dashboard_ns.marshal_with(due_word_model)
+    @dashboard_ns.doc('get_due_words',
+        params={'limit': f'number of words, max {DUE_WORDS_MAX_LIMIT} (default 20)'})
+    def get(self):
+        '''Get the words to review now, by spaced repetition'''
+        user_id = get_jwt_identity()
+        limit = get_limit_arg('limit', 20, DUE_WORDS_MAX_LIMIT)
+        data = ReviewScheduleModel.get_due_words(user_id, limit)
+        return data
+
+
+@dashboard_ns.route('/export')
+class HistoricExport(Resource):
+
+    @jwt_required()
+    @limiter.limit("24 per day")
+    @dashboard_ns.doc('export_historic_by_user')
+    @dashboard_ns.produces(['application/x-ndjson'])
+    def get(self):
+        '''Export the user history as newline delimited JSON'''
+        user_id = get_jwt_identity()
+
+        def generate():
+            for row in HistoricHitsModel.iter_historics_by_user(user_id):
+                yield encode({
+                    'id': row.id,
+                    'id_word': row.id_word,
+                    'hit': row.hit,
+                    'date': row.date,
+                }) + b'\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
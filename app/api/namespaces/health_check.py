@@ -1,5 +1,8 @@
+from flask import current_app
 from flask_restx import Namespace, Resource
 
+from app.api.utils.db_pool import get_pool_stats, get_probe
+from app.api.utils.wrappers_auth import admin_required
 from app.extensions import limiter
 
 
@@ -14,4 +17,12 @@ class HealthCheck(Resource):
         return 'ok', 200
 
 
-        
\ No newline at end of file
+@health_check_ns.route('/db')
+class HealthCheckDatabase(Resource):
+    @admin_required()
+    @health_check_ns.doc('health_db')
+    def get(self):
+        '''Connection pool of the worker and database latency'''
+        probe = get_probe(current_app.config.get('HEALTH_DB_PROBE_TTL', 10))
+        data = {'pool': get_pool_stats(), 'probe': probe}
+        return data, 200 if probe['ok'] else 503
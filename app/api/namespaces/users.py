@@ -6,6 +6,8 @@ from flask_jwt_extended import get_jwt_identity, jwt_required, verify_jwt_in_req
 from app.api.models.user import UserModel, RoleModel
 from app.api.schemas.user import UserSchema, UserUpdatePasswordSchema, RolesSchema, UserUpdateRolesSchema
 from app.api.utils.wrappers_auth import role_or_admin_required, admin_required
+from app.api.utils.pagination import get_page_args, page_params
+from app.api.utils.passwords import PasswordHashBusy
 from app.extensions import limiter
 
 
@@ -82,11 +84,12 @@ class User(Resource):
 class UserList(Resource):
 
     @admin_required()
-    @users_ns.doc('list_users')
+    @users_ns.doc('list_users', params=page_params)
     def get(self):
-        '''List all users'''
-        all_users = UserModel.get_all_users()
-        return user_list_schema.dump(all_users), 200
+        '''List users'''
+        limit, after = get_page_args()
+        users, next_cursor = UserModel.get_users_page(limit, after)
+        return {'items': user_list_schema.dump(users), 'next_cursor': next_cursor}, 200
 
     @limiter.limit("20 per day")
     @users_ns.doc(security=None)
@@ -100,7 +103,10 @@ class UserList(Resource):
         if errors:
            raise ValidationError(errors)
 
-        user_data = UserModel.create_user(data)
+        try:
+            user_data = UserModel.create_user(data)
+        except PasswordHashBusy:
+            return {'message': 'Too many sign ups, try again later'}, 503, {'Retry-After': '1'}
         user_serialized = user_output_schema.dump(user_data)
         return user_serialized, 201
 
@@ -146,11 +152,13 @@ class UpdatePasswordUser(Resource):
             errors = user_update_password_schema.validate(data)
             if errors:
                 raise ValidationError(errors)
-            if user.verify_password(data['old_password'], user.password):
+            try:
+                if not user.verify_password(data['old_password'], user.password):
+                    return {'message': 'password is incorrect'}, 400
                 UserModel.update_password(user_id, data['new_password'])
-                return {"message": "password updated"}, 200
-            else:
-                return {'message': 'password is incorrect'}, 400
+            except PasswordHashBusy:
+                return {'message': 'Too many password changes, try again later'}, 503, {'Retry-After': '1'}
+            return {"message": "password updated"}, 200
         return {'message': ITEM_NOT_FOUND}, 404
 
 
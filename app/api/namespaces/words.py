@@ -1,3 +1,4 @@
+from flask import Response, stream_with_context, request
 from flask_restx import Resource, fields, Namespace
 from marshmallow import ValidationError
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -6,7 +7,14 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.api.models.word import WordModel, TagModel, SetModel
 from app.api.schemas.word import WordSchemaInput, WordSchemaOutPut, TagSchema, SetWordsSchema
 from app.api.utils.wrappers_auth import role_or_admin_required
-from app.extensions import limiter
+from app.api.utils.pagination import get_page_args, get_limit_arg, page_params
+from app.api.utils.word_import import import_words, read_words_csv
+from app.api.utils.json_output import encode
+from app.api.utils.fast_serializers import dump_words_page, dump_tags_page, dump_sets_page, dump_words_by_ids
+from app.api.utils.member_ids import set_member_ids, tag_member_ids
+from app.api.utils.word_search import word_search
+from app.api.utils.cache_versions import conditional_get
+from app.extensions import limiter, db
 
 
 words_ns = Namespace('words', description='Words related operations')
@@ -15,13 +23,14 @@ sets_words_ns = Namespace('set_words', description='Sets Words related operation
 
 word_input_schema = WordSchemaInput(exclude=('sets',))
 word_output_schema = WordSchemaOutPut(exclude=('sets',))
-word_list_schema = WordSchemaOutPut(many=True, exclude=('sets',))
 
 tag_schema = TagSchema()
-tag_list_schema = TagSchema(many=True)
 
 set_words_schema = SetWordsSchema()
-set_words_list_schema = SetWordsSchema(many=True)
+
+WORD_IMPORT_MAX_ROWS = 10000
+SAMPLE_MAX_SIZE = 100
+SEARCH_MAX_LIMIT = 50
 
 ITEM_NOT_FOUND = 'Word not found'
 TAG_NOT_FOUND = 'Tag not found'
@@ -34,6 +43,10 @@ word_model = words_ns.model('word', {
     'tags': fields.List(fields.Integer, description='List of tags', default=[])
 })
 
+word_import_model = words_ns.model('word_import', {
+    'words': fields.List(fields.Raw, description='List of words, tags as ids or names')
+})
+
 tag_model = words_ns.model('tag', {
     'name': fields.String(description='name tag')
 })
@@ -44,6 +57,16 @@ set_words_model = words_ns.model('set_words', {
 })
 
 
+def sample_words(member_ids, model, owner_id, not_found_message):
+    """ Random words of a set or tag picked from its cached member ids """
+    n = get_limit_arg('n', 20, SAMPLE_MAX_SIZE)
+    word_ids = member_ids.sample(owner_id, n)
+    # an empty sample is either an empty set or tag, or a missing one
+    if not word_ids and db.session.get(model, owner_id) is None:
+        return {'message': not_found_message}, 404
+    return dump_words_by_ids(word_ids), 200
+
+
 @words_ns.route('/<int:id_word>')
 class Word(Resource):
 
@@ -89,10 +112,13 @@ class Word(Resource):
 class WordList(Resource):
 
     @jwt_required()
+    @conditional_get('words')
+    @words_ns.doc('list_words', params=page_params)
     def get(self):
-        '''List all words'''
-        all_words = WordModel.get_all_words()
-        return word_list_schema.dump(all_words), 200
+        '''List words'''
+        limit, after = get_page_args()
+        words, next_cursor = dump_words_page(limit, after)
+        return {'items': words, 'next_cursor': next_cursor}, 200
 
     @limiter.limit("500 per day")
     @role_or_admin_required('create_word')
@@ -111,6 +137,65 @@ class WordList(Resource):
         return word_serialized, 201
 
 
+@words_ns.route('/search')
+class WordSearch(Resource):
+
+    @jwt_required()
+    @words_ns.doc('search_words', params={
+        'q': 'prefix or part of the name or translation',
+        'limit': f'number of words, max {SEARCH_MAX_LIMIT} (default 10)',
+    })
+    def get(self):
+        '''Search words by name or translation'''
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': ['q cannot be left blank']})
+        limit = get_limit_arg('limit', 10, SEARCH_MAX_LIMIT)
+        return word_search.search(query, limit), 200
+
+
+@words_ns.route('/import')
+class WordImport(Resource):
+
+    @limiter.limit("20 per day")
+    @role_or_admin_required('create_word')
+    @words_ns.doc('import_words')
+    @words_ns.expect(word_import_model)
+    @words_ns.response(200, 'import report')
+    def post(self):
+        '''Import words from JSON or CSV (text/csv body or file field)'''
+        if request.mimetype == 'text/csv':
+            rows = read_words_csv(request.get_data(as_text=True))
+        elif 'file' in request.files:
+            rows = read_words_csv(request.files['file'].read().decode('utf-8-sig'))
+        else:
+            data = words_ns.payload or {}
+            rows = data.get('words') if isinstance(data, dict) else None
+            if not isinstance(rows, list):
+                raise ValidationError({'words': ['Field \'words\' must be a list']})
+
+        if len(rows) > WORD_IMPORT_MAX_ROWS:
+            raise ValidationError({'words': [f'import is limited to {WORD_IMPORT_MAX_ROWS} rows']})
+
+        return import_words(rows), 200
+
+
+@words_ns.route('/export')
+class WordExport(Resource):
+
+    @jwt_required()
+    @limiter.limit("24 per day")
+    @words_ns.doc('export_words')
+    @words_ns.produces(['application/x-ndjson'])
+    def get(self):
+        '''Export all words as newline delimited JSON'''
+        def generate():
+            for word in WordModel.iter_all_words():
+                yield encode(word_output_schema.dump(word)) + b'\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @tags_ns.route('/<int:tag_id>')
 class Tag(Resource):
 
@@ -136,15 +221,28 @@ class Tag(Resource):
         return {'message': ITEM_NOT_FOUND}, 404
 
 
+@tags_ns.route('/<int:tag_id>/sample')
+class TagSample(Resource):
+
+    @jwt_required()
+    @tags_ns.doc('sample_tag_words',
+        params={'n': f'number of random words, max {SAMPLE_MAX_SIZE} (default 20)'})
+    def get(self, tag_id):
+        '''Get random words of a tag'''
+        return sample_words(tag_member_ids, TagModel, tag_id, TAG_NOT_FOUND)
+
+
 @tags_ns.route('/')
 class TagList(Resource):
 
     @jwt_required()
-    @tags_ns.doc('list_tags')
+    @conditional_get('tags')
+    @tags_ns.doc('list_tags', params=page_params)
     def get(self):
-        '''List all tags'''
-        all_tags = TagModel.get_all_tags()
-        return tag_list_schema.dump(all_tags), 200
+        '''List tags'''
+        limit, after = get_page_args()
+        tags, next_cursor = dump_tags_page(limit, after)
+        return {'items': tags, 'next_cursor': next_cursor}, 200
 
     @limiter.limit("100 per day")
     @role_or_admin_required('create_word')
@@ -204,15 +302,28 @@ class SetWords(Resource):
         return {'message': ITEM_NOT_FOUND}, 404
 
 
+@sets_words_ns.route('/<int:set_words_id>/sample')
+class SetWordsSample(Resource):
+
+    @jwt_required()
+    @sets_words_ns.doc('sample_set_words',
+        params={'n': f'number of random words, max {SAMPLE_MAX_SIZE} (default 20)'})
+    def get(self, set_words_id):
+        '''Get random words of a set words'''
+        return sample_words(set_member_ids, SetModel, set_words_id, SET_WORDS_NOT_FOUND)
+
+
 @sets_words_ns.route('/')
 class SetWordsList(Resource):
 
     @jwt_required()
-    @words_ns.doc('list_sets_words')
+    @conditional_get('sets')
+    @words_ns.doc('list_sets_words', params=page_params)
     def get(self):
-        '''List all set words'''
-        all_set_words = SetModel.get_all_sets()
-        return set_words_list_schema.dump(all_set_words), 200
+        '''List set words'''
+        limit, after = get_page_args()
+        sets, next_cursor = dump_sets_page(limit, after)
+        return {'items': sets, 'next_cursor': next_cursor}, 200
 
     @limiter.limit("50 per day")
     @role_or_admin_required('create_set_words')
@@ -1,6 +1,6 @@
-from marshmallow import validates, ValidationError, Schema, fields
+from marshmallow import validates_schema, ValidationError, Schema, fields
 
-from app.api.models.word import HistoricHitsModel, WordModel
+from app.api.utils.id_cache import word_ids_cache
 
 
 class HistoricSchema(Schema):
@@ -8,10 +8,13 @@ class HistoricSchema(Schema):
     id_word = fields.Integer(required=True)
     hit = fields.Boolean(required=True)
 
-    @validates("id_word")
-    def validate_words(self, value):
-        result = WordModel.query.filter(WordModel.id==value).first()
+    @validates_schema(pass_many=True)
+    def validate_words(self, data, many, **kwargs):
+        """ Check every id_word of the payload at once """
+        rows = data if many else [data]
+        ids = {row['id_word'] for row in rows}
+        missing = word_ids_cache.get_missing_ids(ids)
 
-        if result is None:
-            raise ValidationError(f"Word ID {value} does not exist")
-        return value
\ No newline at end of file
+        if missing:
+            missing_ids = ', '.join(map(str, missing))
+            raise ValidationError(f"Word IDs {missing_ids} do not exist", field_name="id_word")
\ No newline at end of file
@@ -1,7 +1,8 @@
 from marshmallow import fields, validate, validates_schema, ValidationError, validates, pre_load, Schema
 
 from app.extensions import ma
-from app.api.models.user import UserModel, RoleModel
+from app.api.models.user import UserModel
+from app.api.utils.id_cache import role_ids_cache
 
 
 class RolesSchema(ma.SQLAlchemyAutoSchema):
@@ -37,6 +38,7 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = UserModel
         load_instance = True
+        exclude = ('token_epoch',)
         include_relationships = True
 
     def transform_to_lower(self, data, field_name):
@@ -68,11 +70,10 @@ class UserUpdateRolesSchema(ma.SQLAlchemyAutoSchema):
         if not roles:
             return roles
 
-        role_ids = [role.id for role in RoleModel.query.all()]
-
-        for role in roles:
-            if role.id not in role_ids:
-                raise ValidationError(f"Role ID {role.id} does not exist")
+        missing = role_ids_cache.get_missing_ids(role.id for role in roles)
+        if missing:
+            missing_ids = ', '.join(map(str, missing))
+            raise ValidationError(f"Role IDs {missing_ids} do not exist")
         
         return roles
 
@@ -91,6 +92,8 @@ class UserUpdateRolesSchema(ma.SQLAlchemyAutoSchema):
         model = UserModel
         load_instance = True
         include_relationships = True
+        # role ids are checked by validate_roles, not loaded one by one
+        transient = True
 
 
 class UserUpdatePasswordSchema(Schema):
@@ -1,7 +1,8 @@
-from marshmallow import validates, ValidationError, pre_load, validates_schema, fields
+from marshmallow import validates, ValidationError, pre_load, validates_schema, fields, validate, Schema
 
 from app.extensions import ma
 from app.api.models.word import WordModel, TagModel, SetModel
+from app.api.utils.id_cache import tag_ids_cache, word_ids_cache
 
 
 class TagSchema(ma.SQLAlchemyAutoSchema):
@@ -26,6 +27,8 @@ class WordSchemaInput(ma.SQLAlchemyAutoSchema):
         model = WordModel
         load_instance = True
         include_relationships = True
+        # related ids are checked by the validators, not loaded one by one
+        transient = True
 
     def transform_to_lower(self, data, field_name):
         if field_name in data:
@@ -41,15 +44,37 @@ class WordSchemaInput(ma.SQLAlchemyAutoSchema):
     def validate_tags(self, tags):
         if not tags:
             return tags
-        tag_ids = [tag.id for tag in TagModel.query.all()]
 
-        for tag in tags:
-            if tag.id not in tag_ids:
-                raise ValidationError(f"Tag ID {tag.id} does not exist")
+        missing = tag_ids_cache.get_missing_ids(tag.id for tag in tags)
+        if missing:
+            missing_ids = ', '.join(map(str, missing))
+            raise ValidationError(f"Tag IDs {missing_ids} do not exist")
         
         return tags
 
 
+class WordImportSchema(Schema):
+    """ Validate a row of the bulk import without database access,
+    tags may be ids or names """
+
+    name = fields.String(required=True, validate=validate.Length(min=1, max=80))
+    translation = fields.String(required=True, validate=validate.Length(min=1, max=80))
+    annotation = fields.String(allow_none=True, load_default=None)
+    tags = fields.List(fields.Raw(), load_default=list)
+
+    @pre_load
+    def transform_fields(self, data, **kwargs):
+        if isinstance(data.get('name'), str):
+            data['name'] = data['name'].lower()
+        return data
+
+    @validates("tags")
+    def validate_tags(self, tags):
+        for tag in tags:
+            if isinstance(tag, bool) or not isinstance(tag, (int, str)):
+                raise ValidationError(f"Tag {tag!r} must be an id or a name")
+
+
 class WordSchemaOutPut(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = WordModel
@@ -81,11 +106,10 @@ class SetWordsSchema(ma.SQLAlchemyAutoSchema):
         if data.get('words'):
             words = data.get('words')                
 
-            word_ids = [word.id for word in WordModel.query.all()]
-
-            for word in words:
-                if word.id not in word_ids:
-                    raise ValidationError(f"Word ID {word.id} does not exist", field_name="words")
+            missing = word_ids_cache.get_missing_ids(word.id for word in words)
+            if missing:
+                missing_ids = ', '.join(map(str, missing))
+                raise ValidationError(f"Word IDs {missing_ids} do not exist", field_name="words")
         else:
            raise ValidationError(f"Field 'words' cannot be left blank", field_name="words")
  
@@ -93,4 +117,5 @@ class SetWordsSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = SetModel
         load_instance = True
-        include_relationships = True
\ No newline at end of file
+        include_relationships = True
+        transient = True
\ No newline at end of file
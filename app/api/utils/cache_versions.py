@@ -0,0 +1,81 @@
+import hashlib
+import time
+from functools import wraps
+
+from flask import request, Response
+
+from app.extensions import cache
+from app.api.utils.table_events import on_tables_committed, DELETE
+
+
+def _version_key(name):
+    return f'version_{name}'
+
+
+def get_version(name):
+    """ Current version of a cached resource, starts from a timestamp so a
+    lost cache entry never returns to a version that was already handed out """
+    version = cache.get(_version_key(name))
+    if version is None:
+        cache.add(_version_key(name), time.time_ns(), timeout=0)
+        version = cache.get(_version_key(name))
+    return version
+
+
+def bump_version(name):
+    """ A new timestamp instead of an increment, the increment of the
+    filesystem cache is a read and a write, so two workers bumping at once
+    could hand out the same version for two different contents """
+    cache.set(_version_key(name), time.time_ns(), timeout=0)
+
+
+def user_dashboard_version_name(id_user):
+    """ Version embedded in every dashboard cache key of the user """
+    return f'dashboard_user_{id_user}'
+
+
+# catalogue resources whose representation changes with each table
+CATALOGUE_TABLES = {
+    'words': ('words', 'word_search'),
+    'tags': ('tags', 'words'),
+    'tags_words': ('words',),
+    'sets': ('sets',),
+    'sets_words': ('sets',),
+}
+
+
+@on_tables_committed
+def _bump_catalogue_versions(changes):
+    names = set()
+    for table_name, operation in changes:
+        names.update(CATALOGUE_TABLES.get(table_name, ()))
+        # deleting a word also removes it from the sets
+        if table_name == 'words' and operation == DELETE:
+            names.add('sets')
+    for name in names:
+        bump_version(name)
+
+
+def conditional_get(name):
+    """ Answer If-None-Match with 304 from the resource version before
+    running the view, the ETag also covers the query string """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            path_hash = hashlib.md5(request.full_path.encode('utf-8')).hexdigest()[:16]
+            etag = f'{name}-{get_version(name)}-{path_hash}'
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+            if request.if_none_match.contains(etag):
+                return Response(status=304, headers=headers)
+
+            rv = fn(*args, **kwargs)
+            if not isinstance(rv, tuple):
+                rv = (rv,)
+            data = rv[0]
+            code = rv[1] if len(rv) > 1 else 200
+            rv_headers = rv[2] if len(rv) > 2 else {}
+            return data, code, {**rv_headers, **headers}
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,57 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import g, has_request_context
+
+from app.extensions import cache
+
+
+DateWindow = namedtuple('DateWindow', 'today yesterday thirty_days_ago start_date_90days')
+
+
+def _utc_now():
+    return datetime.now(timezone.utc)
+
+
+def get_date_window():
+    """ Dashboard dates ending yesterday (UTC), computed once per request
+    so a request crossing midnight sees a single window """
+    if has_request_context() and 'date_window' in g:
+        return g.date_window
+
+    today = _utc_now().date()
+    yesterday = today - timedelta(days=1)
+    window = DateWindow(
+        today=today,
+        yesterday=yesterday,
+        thirty_days_ago=yesterday - timedelta(days=30),
+        start_date_90days=yesterday - timedelta(days=90),
+    )
+    if has_request_context():
+        g.date_window = window
+    return window
+
+
+def seconds_until_next_day():
+    now = _utc_now()
+    next_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return max(int((next_day - now).total_seconds()), 1)
+
+
+def cached_until_next_day(key_prefix):
+    """ Cache the view result until the next UTC midnight, when the
+    date window moves and every aggregate changes """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            key = key_prefix()
+            rv = cache.get(key)
+            if rv is None:
+                rv = fn(*args, **kwargs)
+                cache.set(key, rv, timeout=seconds_until_next_day())
+            return rv
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from sqlalchemy import exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.extensions import db, cache
+
+
+class PoolWaitStats:
+    """ Time spent by checkouts waiting for a connection of the pool,
+    which includes opening a new connection when the pool grows """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, timeout=False):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            if timeout:
+                self.timeouts += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.count,
+                'avg_ms': round(self.total / self.count * 1000, 3) if self.count else 0,
+                'max_ms': round(self.max * 1000, 3),
+                'timeouts': self.timeouts,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """ QueuePool recording how long each checkout waited """
+
+    # logs as the sqlalchemy pool, under app.* it would inherit the flask debug level
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.QueuePool'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timeout=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def init_app(app):
+    """ Use the timed pool when the engine options configure a queue pool,
+    must run before db.init_app """
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if 'pool_size' in options and 'poolclass' not in options:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, 'poolclass': TimedQueuePool}
+
+
+def get_pool_stats():
+    pool = db.engine.pool
+    stats = {'class': type(pool).__name__, 'status': pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats['wait'] = pool.wait_stats.to_dict()
+    return stats
+
+
+def get_probe(ttl=10):
+    """ Latency of a SELECT 1, cached for ttl seconds so the endpoint
+    cannot be used to load the database """
+    probe = cache.get('health_db_probe')
+    if probe is None:
+        start = time.perf_counter()
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            probe = {'ok': True}
+        except exc.SQLAlchemyError as error:
+            probe = {'ok': False, 'error': type(error).__name__}
+        probe['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        probe['measured_at'] = int(time.time())
+        cache.set('health_db_probe', probe, timeout=ttl)
+    return probe
@@ -0,0 +1,105 @@
+from collections import defaultdict
+
+from app.extensions import db
+from app.api.models.word import WordModel, TagModel, SetModel, tags_words, sets_words
+from app.api.utils.pagination import paginate
+
+
+class RowSerializer:
+    """ Build dicts straight from row tuples for read only list responses.
+    The keys follow the field order of the marshmallow schema it replaces,
+    nested keys come first as the schemas declare them before the model
+    fields, so the JSON output is the same """
+
+    def __init__(self, columns, nested=()):
+        self.columns = [column for _, column in columns]
+        self.keys = tuple(nested) + tuple(key for key, _ in columns)
+
+    def __call__(self, row, *nested_values):
+        return dict(zip(self.keys, (*nested_values, *row)))
+
+
+tag_serializer = RowSerializer([
+    ('name', TagModel.name),
+    ('id', TagModel.id),
+])
+
+word_serializer = RowSerializer([
+    ('id', WordModel.id),
+    ('name', WordModel.name),
+    ('translation', WordModel.translation),
+    ('annotation', WordModel.annotation),
+], nested=('tags',))
+
+set_words_serializer = RowSerializer([
+    ('id', SetModel.id),
+    ('name', SetModel.name),
+], nested=('words',))
+
+
+def _page(serializer, id_column, limit, after):
+    query = db.session.query(*serializer.columns)
+    return paginate(query, id_column, limit, after)
+
+
+def _tags_by_word(word_ids):
+    tags = defaultdict(list)
+    if not word_ids:
+        return tags
+    rows = db.session.execute(
+        db.select(tags_words.c.word_id, *tag_serializer.columns)
+        .join(TagModel, TagModel.id == tags_words.c.tag_id)
+        .filter(tags_words.c.word_id.in_(word_ids))
+        .distinct()
+        .order_by(tags_words.c.word_id, TagModel.id)
+    )
+    for word_id, *tag in rows:
+        tags[word_id].append(tag_serializer(tag))
+    return tags
+
+
+def _words_by_set(set_ids):
+    words = defaultdict(list)
+    if not set_ids:
+        return words
+    rows = db.session.execute(
+        db.select(sets_words.c.set_id, sets_words.c.word_id)
+        .filter(sets_words.c.set_id.in_(set_ids))
+        .distinct()
+        .order_by(sets_words.c.set_id, sets_words.c.word_id)
+    )
+    for set_id, word_id in rows:
+        words[set_id].append(word_id)
+    return words
+
+
+def dump_tags_page(limit, after=None):
+    rows, next_cursor = _page(tag_serializer, TagModel.id, limit, after)
+    return [tag_serializer(row) for row in rows], next_cursor
+
+
+def dump_words_page(limit, after=None):
+    rows, next_cursor = _page(word_serializer, WordModel.id, limit, after)
+    tags = _tags_by_word([row.id for row in rows])
+    return [word_serializer(row, tags.get(row.id, [])) for row in rows], next_cursor
+
+
+def dump_sets_page(limit, after=None):
+    rows, next_cursor = _page(set_words_serializer, SetModel.id, limit, after)
+    words = _words_by_set([row.id for row in rows])
+    return [set_words_serializer(row, words.get(row.id, [])) for row in rows], next_cursor
+
+
+def dump_words_by_ids(word_ids):
+    """ Words in the order of word_ids, ids that no longer exist are skipped """
+    if not word_ids:
+        return []
+    rows = db.session.execute(
+        db.select(*word_serializer.columns).filter(WordModel.id.in_(word_ids))
+    )
+    rows_by_id = {row.id: row for row in rows}
+    tags = _tags_by_word(list(rows_by_id))
+    return [
+        word_serializer(rows_by_id[word_id], tags.get(word_id, []))
+        for word_id in word_ids if word_id in rows_by_id
+    ]
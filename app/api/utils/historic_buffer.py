@@ -0,0 +1,159 @@
+import atexit
+import logging
+import os
+import threading
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+
+
+class HistoricBufferFull(Exception):
+    pass
+
+
+class HistoricFlushError(Exception):
+    pass
+
+
+class _Batch:
+    """ Historics of one request, the event is set once they are written """
+
+    def __init__(self, historics):
+        self.historics = historics
+        self.done = threading.Event()
+        self.error = None
+
+
+class HistoricBuffer:
+    """ Write behind buffer for create_historic. Requests append their
+    validated historics and a flusher thread writes them with multi row
+    inserts every HISTORIC_FLUSH_INTERVAL_MS or HISTORIC_FLUSH_ROWS rows,
+    in a single transaction per flush. Submits over HISTORIC_BUFFER_MAX_ROWS
+    pending rows are refused so the caller can answer 503. With
+    HISTORIC_ACK "sync" the request waits for its rows to be committed,
+    with "async" it returns once they are buffered and the rows pending
+    when the process exits are flushed by an atexit handler """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._batches = []
+        self._pending_rows = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('HISTORIC_INGESTION') == 'buffered'
+        self.max_rows = app.config.get('HISTORIC_BUFFER_MAX_ROWS', 10000)
+        self.flush_rows = app.config.get('HISTORIC_FLUSH_ROWS', 500)
+        self.flush_interval = app.config.get('HISTORIC_FLUSH_INTERVAL_MS', 200) / 1000
+        self.sync_ack = app.config.get('HISTORIC_ACK', 'async') == 'sync'
+        self.ack_timeout = app.config.get('HISTORIC_ACK_TIMEOUT', 10)
+        if self.enabled:
+            atexit.register(self.stop)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        # the thread does not survive a fork, each worker starts its own
+        # and drops the batches of the parent, a flusher that died in this
+        # process is replaced and its pending batches are kept
+        if self._pid != os.getpid():
+            self._batches = []
+            self._pending_rows = 0
+            self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, name='historic-flusher', daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, historics):
+        """ Buffer the historics of a request, raises HistoricBufferFull
+        when the buffer has no room and HistoricFlushError when a sync
+        acknowledgement fails """
+        batch = _Batch(historics)
+        with self._condition:
+            if self._stopping:
+                raise HistoricBufferFull('the buffer is shutting down')
+            self._ensure_started()
+            if self._pending_rows + len(historics) > self.max_rows:
+                raise HistoricBufferFull(f'{self._pending_rows} historics waiting to be written')
+            self._batches.append(batch)
+            self._pending_rows += len(historics)
+            if self._pending_rows >= self.flush_rows:
+                self._condition.notify()
+
+        if self.sync_ack:
+            if not batch.done.wait(self.ack_timeout):
+                raise HistoricFlushError('historics were not written in time')
+            if batch.error is not None:
+                raise HistoricFlushError(str(batch.error))
+
+    def _take_batches(self):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._pending_rows >= self.flush_rows or self._stopping,
+                timeout=self.flush_interval
+            )
+            batches, self._batches = self._batches, []
+            self._pending_rows = 0
+            return batches
+
+    def _run(self):
+        while True:
+            batches = self._take_batches()
+            if batches:
+                self.flush(batches)
+            elif self._stopping:
+                return
+
+    def flush(self, batches):
+        try:
+            with self.app.app_context():
+                try:
+                    self._write(batches)
+                finally:
+                    db.session.remove()
+        except Exception as error:
+            # not retried, the rows may be committed already
+            logging.exception(f'flush of {len(batches)} buffered batches failed')
+            for batch in batches:
+                if batch.error is None:
+                    batch.error = error
+        finally:
+            for batch in batches:
+                batch.done.set()
+
+    def _write(self, batches):
+        from app.api.models.word import HistoricHitsModel
+
+        try:
+            HistoricHitsModel.bulk_create_historics(
+                [historic for batch in batches for historic in batch.historics]
+            )
+        except SQLAlchemyError:
+            db.session.rollback()
+            # one bad request must not drop the historics of the others
+            for batch in batches:
+                try:
+                    HistoricHitsModel.bulk_create_historics(batch.historics)
+                except Exception as error:
+                    db.session.rollback()
+                    logging.exception(f'dropped {len(batch.historics)} buffered historics')
+                    batch.error = error
+
+    def stop(self):
+        """ Flush the pending historics and stop the flusher thread """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join()
+
+
+historic_buffer = HistoricBuffer()
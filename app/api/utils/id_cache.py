@@ -0,0 +1,87 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from app.extensions import db
+from app.api.models.user import RoleModel
+from app.api.models.word import TagModel, WordModel, _chunks
+from app.api.utils.table_events import on_tables_committed, INSERT, DELETE
+
+
+class ReferenceIdCache:
+    """ Sorted array with the ids of a model to check if referenced ids exist.
+    The array is dropped when rows are inserted or deleted and expires after
+    ttl seconds, as other workers may have changed the table. Ids not found
+    in the array are confirmed with an IN query, so a stale array never
+    rejects an existing id """
+
+    def __init__(self, model, ttl=300):
+        self.model = model
+        self.ttl = ttl
+        self._ids = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._ids = None
+
+    def _is_warm(self):
+        return self._ids is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _load(self):
+        with self._lock:
+            if self._is_warm():
+                return
+            ids = db.session.execute(
+                db.select(self.model.id).order_by(self.model.id)
+            ).scalars()
+            self._ids = array('q', ids)
+            self._loaded_at = time.monotonic()
+
+    def _contains(self, ids_array, value):
+        index = bisect_left(ids_array, value)
+        return index < len(ids_array) and ids_array[index] == value
+
+    def _query_existing(self, ids):
+        existing = set()
+        for chunk in _chunks(ids):
+            existing.update(db.session.execute(
+                db.select(self.model.id).filter(self.model.id.in_(chunk))
+            ).scalars())
+        return existing
+
+    def get_missing_ids(self, ids):
+        """ Return the sorted ids that do not exist """
+        ids = set(ids)
+        if not ids:
+            return []
+
+        ids_array = self._ids if self._is_warm() else None
+        if ids_array is None:
+            unknown = ids
+        else:
+            unknown = {value for value in ids if not self._contains(ids_array, value)}
+
+        missing = unknown - self._query_existing(unknown) if unknown else set()
+
+        if ids_array is None:
+            self._load()
+        return sorted(missing)
+
+
+tag_ids_cache = ReferenceIdCache(TagModel)
+word_ids_cache = ReferenceIdCache(WordModel)
+role_ids_cache = ReferenceIdCache(RoleModel)
+
+_caches_by_table = {
+    cache.model.__tablename__: cache
+    for cache in (tag_ids_cache, word_ids_cache, role_ids_cache)
+}
+
+
+@on_tables_committed
+def _invalidate_changed_tables(changes):
+    for table_name, operation in changes:
+        if operation in (INSERT, DELETE) and table_name in _caches_by_table:
+            _caches_by_table[table_name].invalidate()
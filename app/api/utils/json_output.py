@@ -0,0 +1,51 @@
+import json
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import current_app, make_response
+
+from app.api.utils.request_timing import add_timing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    """ Types the stdlib json does not encode, orjson handles dates itself """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode(data, settings=None):
+    """ Encode data to UTF-8 JSON with the backend chosen by
+    RESTX_JSON_BACKEND. The stdlib json is the default, orjson is opt-in as
+    its output is compact and not ASCII escaped. Falls back to the stdlib
+    json when orjson is not installed or when json.dumps settings (indent,
+    sort_keys, ...) are given """
+    settings = dict(settings or {})
+    if current_app.config.get('RESTX_JSON_BACKEND') == 'orjson' and orjson and not settings:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    settings.setdefault('default', _default)
+    return json.dumps(data, **settings).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """ Makes a Flask response with a JSON encoded body """
+    settings = dict(current_app.config.get('RESTX_JSON', {}))
+    if current_app.debug:
+        settings.setdefault('indent', 4)
+
+    start = time.perf_counter()
+    # always end the json dumps with a new line like flask-restx does
+    body = encode(data, settings) + b'\n'
+    add_timing('serialize', time.perf_counter() - start)
+    resp = make_response(body, code)
+    resp.headers.extend(headers or {})
+    return resp
@@ -0,0 +1,55 @@
+import random
+import threading
+from array import array
+from collections import OrderedDict
+
+from app.extensions import db
+from app.api.models.word import tags_words, sets_words
+from app.api.utils.cache_versions import get_version
+
+
+class MemberIdCache:
+    """ Sorted array with the word ids of each set or tag, kept for the
+    cache version of the resource so a random sample is taken with random
+    index picks instead of ORDER BY RANDOM() over the members. Only the
+    max_size most recently used owners are kept in memory """
+
+    def __init__(self, owner_column, member_column, version_name, max_size=1024):
+        self.owner_column = owner_column
+        self.member_column = member_column
+        self.version_name = version_name
+        self.max_size = max_size
+        self._members = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_member_ids(self, owner_id):
+        version = get_version(self.version_name)
+        with self._lock:
+            cached = self._members.get(owner_id)
+            if cached is not None and cached[0] == version:
+                self._members.move_to_end(owner_id)
+                return cached[1]
+
+        ids = array('q', db.session.execute(
+            db.select(self.member_column)
+            .filter(self.owner_column == owner_id)
+            .distinct()
+            .order_by(self.member_column)
+        ).scalars())
+
+        with self._lock:
+            self._members[owner_id] = (version, ids)
+            self._members.move_to_end(owner_id)
+            while len(self._members) > self.max_size:
+                self._members.popitem(last=False)
+        return ids
+
+    def sample(self, owner_id, n):
+        """ Up to n distinct random member ids """
+        ids = self.get_member_ids(owner_id)
+        return random.sample(ids, min(n, len(ids)))
+
+
+# tags_words changes bump the words version, sets_words the sets one
+set_member_ids = MemberIdCache(sets_words.c.set_id, sets_words.c.word_id, 'sets')
+tag_member_ids = MemberIdCache(tags_words.c.tag_id, tags_words.c.word_id, 'words')
@@ -0,0 +1,50 @@
+from flask import request
+from marshmallow import ValidationError
+
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+page_params = {
+    'limit': f'items per page, max {MAX_PAGE_LIMIT} (default {DEFAULT_PAGE_LIMIT})',
+    'after': 'cursor returned as next_cursor by the previous page',
+}
+
+
+def _get_int_arg(name, default=None):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: [f'{name} must be an integer']})
+
+
+def get_limit_arg(name, default, maximum):
+    """ Get a count between 1 and maximum from the query string """
+    value = _get_int_arg(name, default)
+    if not 1 <= value <= maximum:
+        raise ValidationError({name: [f'{name} must be between 1 and {maximum}']})
+    return value
+
+
+def get_page_args():
+    """ Get limit and after cursor from the query string """
+    limit = get_limit_arg('limit', DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT)
+    after = _get_int_arg('after')
+    return limit, after
+
+
+def paginate(query, column, limit, after=None):
+    """ Keyset pagination ordered by a unique column,
+    returns the page items and the cursor to the next page """
+    if after is not None:
+        query = query.filter(column > after)
+    items = query.order_by(column.asc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = getattr(items[-1], column.key)
+    return items, next_cursor
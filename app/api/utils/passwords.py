@@ -0,0 +1,81 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from passlib.context import CryptContext
+
+
+class PasswordHashBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """ Hash and verify passwords in a bounded thread pool, so a burst of
+    logins waits for PASSWORD_HASH_WORKERS threads instead of taking every
+    request thread. Hashes of the deprecated schemes or of another cost are
+    reported by verify_and_update to be replaced on login """
+
+    def __init__(self):
+        self.context = CryptContext(schemes=['sha512_crypt', 'sha256_crypt'])
+        self.workers = 2
+        self.timeout = 10
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        schemes = app.config.get('PASSWORD_SCHEMES', 'sha512_crypt,sha256_crypt').split(',')
+        rounds = app.config.get('PASSWORD_ROUNDS')
+        settings = {}
+        if rounds:
+            # hashes with any other cost are rehashed on the next login
+            settings = {
+                f'{schemes[0]}__{key}': rounds
+                for key in ('default_rounds', 'min_rounds', 'max_rounds')
+            }
+        self.context = CryptContext(schemes=schemes, deprecated='auto', **settings)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self._executor = None
+
+    def _get_executor(self):
+        # the pool threads do not survive a fork, each worker creates its own
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+                # running plus waiting calls, the others give up at once
+                self._slots = threading.BoundedSemaphore(self.workers * 4)
+                self._pid = os.getpid()
+            return self._executor, self._slots
+
+    def _run(self, fn, *args):
+        executor, slots = self._get_executor()
+        if not slots.acquire(blocking=False):
+            raise PasswordHashBusy('too many passwords waiting to be hashed')
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            # the only wait of the request, a slot is never waited for
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PasswordHashBusy('password hash timed out')
+
+    def hash(self, password):
+        return self._run(self.context.hash, password)
+
+    def verify_and_update(self, password, password_hash):
+        """ Returns (valid, new_hash), new_hash is None when the hash is current """
+        return self._run(self.context.verify_and_update, password, password_hash)
+
+    def dummy_verify(self):
+        """ Spend the time of a verification when the user does not exist """
+        return self._run(self.context.dummy_verify)
+
+
+password_hasher = PasswordHasher()
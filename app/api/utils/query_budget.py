@@ -0,0 +1,43 @@
+import logging
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def init_app(app):
+    """ Count SQL statements per request when SQLALCHEMY_QUERY_BUDGET is set
+    or SERVER_TIMING reports them, requests over the budget raise in testing
+    and are logged otherwise """
+    budget = app.config.get('SQLALCHEMY_QUERY_BUDGET')
+    if budget or app.config.get('SERVER_TIMING'):
+        if not event.contains(Engine, 'before_cursor_execute', _count_query):
+            event.listen(Engine, 'before_cursor_execute', _count_query)
+
+        # g belongs to the app context, which an outer context shares
+        @app.before_request
+        def reset_query_count():
+            g.query_count = 0
+
+    if not budget:
+        return
+
+    @app.after_request
+    def check_query_budget(response):
+        count = g.get('query_count', 0)
+        response.headers['X-Query-Count'] = str(count)
+        if count > budget:
+            message = f'{request.method} {request.path} ran {count} SQL statements, budget is {budget}'
+            if app.testing:
+                raise QueryBudgetExceeded(message)
+            logging.warning(message)
+        return response
@@ -0,0 +1,76 @@
+import json
+import logging
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger('request_timing')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # kept on the context of the statement, a statement that raises never
+    # reaches the after event and its start time goes away with it
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_query_start', None)
+    if start is not None and has_request_context() and 'timings' in g:
+        g.timings['db'] += time.perf_counter() - start
+
+
+def add_timing(name, seconds):
+    """ Add time to a metric of the request when SERVER_TIMING is enabled """
+    if has_request_context() and 'timings' in g:
+        g.timings[name] += seconds
+
+
+def init_app(app):
+    """ With SERVER_TIMING enabled, each response gets a Server-Timing header
+    with the database, serialisation and handler times and the request is
+    logged as a JSON line. The query count comes from the query_budget
+    listener, registered by its init_app when SERVER_TIMING is on """
+    if not app.config.get('SERVER_TIMING'):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_timing():
+        g.timings = {'db': 0.0, 'serialize': 0.0}
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def add_server_timing(response):
+        if 'timings' not in g:
+            return response
+        total = time.perf_counter() - g.request_start
+        db_time = g.timings['db']
+        serialize = g.timings['serialize']
+        handler = max(total - db_time - serialize, 0.0)
+        queries = g.get('query_count', 0)
+
+        response.headers['Server-Timing'] = ', '.join((
+            f'db;dur={db_time * 1000:.2f};desc="{queries} queries"',
+            f'serialize;dur={serialize * 1000:.2f}',
+            f'handler;dur={handler * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': queries,
+                'db_ms': round(db_time * 1000, 3),
+                'serialize_ms': round(serialize * 1000, 3),
+                'handler_ms': round(handler * 1000, 3),
+                'total_ms': round(total * 1000, 3),
+            }))
+        return response
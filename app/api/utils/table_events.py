@@ -0,0 +1,54 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+_commit_listeners = []
+
+
+def on_tables_committed(listener):
+    """ Register listener(changes) called after each commit that changed
+    tables, changes is a set of (table name, operation) pairs """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def _record(session, table_name, operation):
+    session.info.setdefault('table_changes', set()).add((table_name, operation))
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_flush(session, flush_context):
+    for operation, objects in ((INSERT, session.new), (UPDATE, session.dirty), (DELETE, session.deleted)):
+        for obj in objects:
+            table = getattr(obj, '__table__', None)
+            if table is not None:
+                _record(session, table.name, operation)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_bulk_statement(orm_execute_state):
+    """ Bulk statements skip the unit of work, so they are recorded here """
+    statement = orm_execute_state.statement
+    for operation, is_operation in ((INSERT, orm_execute_state.is_insert),
+                                    (UPDATE, orm_execute_state.is_update),
+                                    (DELETE, orm_execute_state.is_delete)):
+        if is_operation:
+            _record(orm_execute_state.session, statement.table.name, operation)
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_commit(session):
+    changes = session.info.pop('table_changes', None)
+    if not changes:
+        return
+    for listener in _commit_listeners:
+        listener(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('table_changes', None)
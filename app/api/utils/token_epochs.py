@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.extensions import db, jwt
+from app.api.models.user import UserModel
+
+
+class TokenEpochCache:
+    """ Token epoch of each user kept by the worker. The users table is
+    read again for a user only after refresh_interval seconds, so a role
+    change, password change or deletion made by another worker is seen
+    within that delay while every other request is a dictionary lookup.
+    A token epoch change or deletion committed by this worker drops the
+    epochs of those users at once """
+
+    def __init__(self, refresh_interval=5, max_size=10000):
+        self.refresh_interval = refresh_interval
+        self.max_size = max_size
+        self._epochs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, user_ids=None):
+        """ Drop the epochs of user_ids, or of every user """
+        with self._lock:
+            if user_ids is None:
+                self._epochs.clear()
+                return
+            for user_id in user_ids:
+                self._epochs.pop(user_id, None)
+
+    def get_epoch(self, user_id):
+        """ Current epoch of the user, None when the user does not exist """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._epochs.get(user_id)
+            if cached is not None and now - cached[1] < self.refresh_interval:
+                return cached[0]
+
+        epoch = db.session.execute(
+            db.select(UserModel.token_epoch).filter(UserModel.id == user_id)
+        ).scalar()
+        with self._lock:
+            self._epochs[user_id] = (epoch, now)
+            self._epochs.move_to_end(user_id)
+            while len(self._epochs) > self.max_size:
+                self._epochs.popitem(last=False)
+        return epoch
+
+
+token_epochs = TokenEpochCache()
+
+
+def init_app(app):
+    token_epochs.refresh_interval = app.config.get('TOKEN_EPOCH_REFRESH_SECONDS', 5)
+
+
+def _record_users(session, user_ids):
+    session.info.setdefault('token_epoch_users', set()).update(user_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_epoch_changes(session, flush_context):
+    """ Users whose token epoch changed or who were deleted, other updates
+    of the users table such as a rehash on login keep the cached epochs """
+    user_ids = {
+        user.id for user in session.dirty
+        if isinstance(user, UserModel) and inspect(user).attrs.token_epoch.history.has_changes()
+    }
+    user_ids.update(user.id for user in session.deleted if isinstance(user, UserModel))
+    if user_ids:
+        _record_users(session, user_ids)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_bulk_users_statement(orm_execute_state):
+    """ Bulk statements do not tell which rows they changed, None drops
+    every cached epoch """
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name == UserModel.__tablename__:
+            _record_users(orm_execute_state.session, {None})
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_token_epochs(session):
+    user_ids = session.info.pop('token_epoch_users', None)
+    if not user_ids:
+        return
+    token_epochs.invalidate(None if None in user_ids else user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_epoch_changes(session):
+    session.info.pop('token_epoch_users', None)
+
+
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_payload):
+    """ Tokens issued before the last epoch bump of the user, tokens
+    without the claim were issued at epoch 0 """
+    epoch = token_epochs.get_epoch(jwt_payload['sub'])
+    return epoch is None or jwt_payload.get('epoch', 0) != epoch
@@ -0,0 +1,46 @@
+import csv
+import io
+
+from marshmallow import ValidationError
+
+from app.api.models.word import WordModel
+from app.api.schemas.word import WordImportSchema
+
+
+CSV_TAGS_SEPARATOR = '|'
+
+word_import_schema = WordImportSchema()
+
+
+def read_words_csv(text):
+    """ Read rows with the columns name, translation, annotation and tags,
+    tags are names separated by '|' """
+    rows = []
+    for row in csv.DictReader(io.StringIO(text)):
+        tags = row.get('tags') or ''
+        rows.append({
+            'name': row.get('name'),
+            'translation': row.get('translation'),
+            'annotation': row.get('annotation') or None,
+            'tags': [tag.strip() for tag in tags.split(CSV_TAGS_SEPARATOR) if tag.strip()],
+        })
+    return rows
+
+
+def import_words(rows):
+    """ Validate and insert the rows, invalid rows are reported
+    without aborting the import """
+    errors = []
+    valid_rows = []
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'name': None, 'message': 'row must be an object'})
+            continue
+        try:
+            valid_rows.append((index, word_import_schema.load(row)))
+        except ValidationError as error:
+            errors.append({'row': index, 'name': row.get('name'), 'message': error.messages})
+
+    created, import_errors = WordModel.import_words(valid_rows)
+    errors = sorted(errors + import_errors, key=lambda error: error['row'])
+    return {'created': created, 'errors': errors}
@@ -0,0 +1,178 @@
+import logging
+import threading
+from collections import defaultdict
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from flask import current_app
+from sqlalchemy import case, or_
+
+from app.extensions import db
+from app.api.models.word import WordModel
+from app.api.utils.cache_versions import get_version
+
+
+SEARCH_MIN_TRIGRAM_LENGTH = 3
+
+
+def normalize(text):
+    """ Casefolded text without accents, so "cafe" finds "Café" """
+    text = text or ''
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text).casefold()
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def _trigrams(text):
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class WordSearchIndex:
+    """ In memory index of word names and translations. Prefixes are found
+    with bisect over the sorted normalized terms and substrings of at least
+    three characters by intersecting the trigram posting lists, the
+    candidates are then checked against the normalized texts """
+
+    def __init__(self, rows):
+        """ rows of (id, name, translation) ordered by id, so the posting
+        lists are built already sorted """
+        self.words = {}
+        terms = []
+        postings = defaultdict(list)
+        for word_id, name, translation in rows:
+            texts = (normalize(name), normalize(translation))
+            self.words[word_id] = (name, translation, texts)
+            terms.append((texts[0], word_id))
+            terms.append((texts[1], word_id))
+            for trigram in _trigrams(texts[0]) | _trigrams(texts[1]):
+                postings[trigram].append(word_id)
+
+        terms.sort()
+        self.terms = [term for term, _ in terms]
+        self.term_ids = array('q', (word_id for _, word_id in terms))
+        self.postings = {trigram: array('q', ids) for trigram, ids in postings.items()}
+
+    def _prefix_ids(self, query, limit):
+        ids = []
+        index = bisect_left(self.terms, query)
+        while index < len(self.terms) and len(ids) < limit and self.terms[index].startswith(query):
+            word_id = self.term_ids[index]
+            if word_id not in ids:
+                ids.append(word_id)
+            index += 1
+        return ids
+
+    def _substring_ids(self, query, limit, exclude):
+        trigrams = sorted(_trigrams(query), key=lambda trigram: len(self.postings.get(trigram, ())))
+        if not trigrams or trigrams[0] not in self.postings:
+            return []
+
+        candidates = set(self.postings[trigrams[0]])
+        for trigram in trigrams[1:]:
+            candidates.intersection_update(self.postings.get(trigram, ()))
+            if not candidates:
+                return []
+
+        matches = [
+            word_id for word_id in candidates - exclude
+            if any(query in text for text in self.words[word_id][2])
+        ]
+        matches.sort(key=lambda word_id: self.words[word_id][2][0])
+        return matches[:limit]
+
+    def search(self, query, limit):
+        """ Prefix matches of name or translation first, then the words
+        containing the query """
+        query = normalize(query)
+        ids = self._prefix_ids(query, limit)
+        if len(ids) < limit and len(query) >= SEARCH_MIN_TRIGRAM_LENGTH:
+            ids += self._substring_ids(query, limit - len(ids), set(ids))
+        return [
+            {'id': word_id, 'name': self.words[word_id][0], 'translation': self.words[word_id][1]}
+            for word_id in ids
+        ]
+
+
+class WordSearch:
+    """ Word search index of the process. Once the word_search version
+    moves, as words are written by any worker, a new index is built in a
+    background thread while the current one keeps answering, only the
+    first search of the process waits for the index to be built """
+
+    def __init__(self):
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._rebuild = None
+
+    def _build(self, version):
+        rows = db.session.execute(
+            db.select(WordModel.id, WordModel.name, WordModel.translation)
+            .order_by(WordModel.id)
+        )
+        index = WordSearchIndex(rows)
+        with self._lock:
+            self._index, self._version = index, version
+
+    def _build_in_background(self, app, version):
+        try:
+            with app.app_context():
+                try:
+                    self._build(version)
+                finally:
+                    db.session.remove()
+        except Exception:
+            # the current index keeps answering, the next search retries
+            logging.exception('word search index rebuild failed')
+
+    def get_index(self):
+        # the version is read before the rows, a word written meanwhile
+        # moves it again and triggers the next rebuild
+        version = get_version('word_search')
+        if self._index is None:
+            self._build(version)
+            return self._index
+
+        with self._lock:
+            rebuilding = self._rebuild is not None and self._rebuild.is_alive()
+            if self._version != version and not rebuilding:
+                self._rebuild = threading.Thread(
+                    target=self._build_in_background,
+                    args=(current_app._get_current_object(), version),
+                    name='word-search-rebuild', daemon=True
+                )
+                self._rebuild.start()
+            return self._index
+
+    def search(self, query, limit):
+        if current_app.config.get('WORD_SEARCH_BACKEND') == 'pg_trgm':
+            return search_words_trgm(query, limit)
+        return self.get_index().search(query, limit)
+
+
+def search_words_trgm(query, limit):
+    """ ILIKE search answered by the pg_trgm GIN indexes on PostgreSQL """
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    prefix = f'{escaped}%'
+    contains = f'%{escaped}%'
+    rows = db.session.execute(
+        db.select(WordModel.id, WordModel.name, WordModel.translation)
+        .filter(or_(
+            WordModel.name.ilike(contains, escape='\\'),
+            WordModel.translation.ilike(contains, escape='\\')
+        ))
+        .order_by(
+            case((or_(
+                WordModel.name.ilike(prefix, escape='\\'),
+                WordModel.translation.ilike(prefix, escape='\\')
+            ), 0), else_=1),
+            WordModel.name
+        )
+        .limit(limit)
+    )
+    return [row._asdict() for row in rows]
+
+
+word_search = WordSearch()
@@ -0,0 +1,154 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+
+from limits.storage import Storage
+
+
+HEADER = struct.Struct('<8sI4x')
+MAGIC = b'LIMMMAP1'
+# key digest, expiry timestamp, counter
+SLOT = struct.Struct('<16sdq')
+EMPTY_DIGEST = bytes(16)
+DEFAULT_SLOTS = 65536
+# probes before the slot closest to expire is taken over
+MAX_PROBES = 32
+
+
+class MmapStorage(Storage):
+    """ Rate limit counters in a memory mapped file shared by every worker
+    process of the host, with RATELIMIT_STORAGE_URI=mmap:///path/to/file.
+    The file is an open addressing hash table of fixed size slots keyed by
+    a digest of the limit key, updates hold an exclusive flock on the file
+    so each incr is atomic across processes. Expired slots are reused and
+    keep the probe chains intact, when all the probed slots are live the
+    one closest to expire is taken over. Only the fixed window strategies
+    are supported """
+
+    STORAGE_SCHEME = ['mmap']
+
+    def __init__(self, uri, slots=DEFAULT_SLOTS, **options):
+        super().__init__(uri, **options)
+        parsed = urllib.parse.urlparse(uri)
+        query = urllib.parse.parse_qs(parsed.query)
+        self.path = parsed.path
+        self.slots = int(query.get('slots', [slots])[0])
+        self._pid = None
+        self._file = None
+        self._map = None
+        self._local_lock = threading.Lock()
+
+    def _open(self):
+        # a forked worker opens its own file description, flock is held
+        # per description and would not exclude the other workers otherwise
+        if self._pid == os.getpid():
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(fd).st_size
+            if size < HEADER.size:
+                os.ftruncate(fd, HEADER.size + self.slots * SLOT.size)
+                os.pwrite(fd, HEADER.pack(MAGIC, self.slots), 0)
+            magic, slots = HEADER.unpack(os.pread(fd, HEADER.size, 0))
+            if magic != MAGIC:
+                raise ValueError(f'{self.path} is not a rate limit storage file')
+            self.slots = slots
+            self._map = mmap.mmap(fd, HEADER.size + slots * SLOT.size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._file = fd
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self):
+        with self._local_lock:
+            self._open()
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                yield self._map
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _offset(self, index):
+        return HEADER.size + index * SLOT.size
+
+    def _probe(self, data, key):
+        """ Offset of the slot of the key and its (expiry, counter),
+        a free or stolen slot with (0, 0) when the key is not stored """
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        start = int.from_bytes(digest[:8], 'little') % self.slots
+        now = time.time()
+        free = None
+        oldest = None
+        for probe in range(min(MAX_PROBES, self.slots)):
+            offset = self._offset((start + probe) % self.slots)
+            slot_digest, expiry, counter = SLOT.unpack_from(data, offset)
+            if slot_digest == digest:
+                if expiry <= now:
+                    return offset, digest, 0.0, 0
+                return offset, digest, expiry, counter
+            if slot_digest == EMPTY_DIGEST:
+                return (free if free is not None else offset), digest, 0.0, 0
+            if free is None and expiry <= now:
+                free = offset
+            if oldest is None or expiry < oldest[1]:
+                oldest = (offset, expiry)
+        return (free if free is not None else oldest[0]), digest, 0.0, 0
+
+    def _find(self, data, key):
+        offset, _, expiry, counter = self._probe(data, key)
+        if counter:
+            return offset, expiry, counter
+        return None
+
+    def incr(self, key, expiry, elastic_expiry=False, amount=1):
+        with self._locked() as data:
+            offset, digest, current_expiry, counter = self._probe(data, key)
+            counter += amount
+            if elastic_expiry or counter == amount:
+                current_expiry = time.time() + expiry
+            SLOT.pack_into(data, offset, digest, current_expiry, counter)
+            return counter
+
+    def get(self, key):
+        with self._locked() as data:
+            found = self._find(data, key)
+            return found[2] if found else 0
+
+    def get_expiry(self, key):
+        with self._locked() as data:
+            found = self._find(data, key)
+            return int(found[1] if found else time.time())
+
+    def check(self):
+        try:
+            with self._locked():
+                return True
+        except OSError:
+            return False
+
+    def reset(self):
+        with self._locked() as data:
+            now = time.time()
+            count = 0
+            for index in range(self.slots):
+                slot_digest, expiry, _ = SLOT.unpack_from(data, self._offset(index))
+                if slot_digest != EMPTY_DIGEST and expiry > now:
+                    count += 1
+            data[HEADER.size:] = bytes(self.slots * SLOT.size)
+            return count
+
+    def clear(self, key):
+        with self._locked() as data:
+            found = self._find(data, key)
+            if found:
+                # keeps the digest so the probe chain stays intact
+                digest = SLOT.unpack_from(data, found[0])[0]
+                SLOT.pack_into(data, found[0], digest, 0.0, 0)
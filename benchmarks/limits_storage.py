@@ -0,0 +1,72 @@
+""" Rate limit check overhead of memory:// against the mmap:// storage,
+and the counter shared by several processes through the mmap file
+
+    python -m benchmarks.limits_storage [--hits 20000] [--keys 1000] [--processes 4]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from limits import RateLimitItemPerDay
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app import limits_storage
+
+
+def measure(uri, hits, keys):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limit = RateLimitItemPerDay(1000000)
+    timings = []
+    for index in range(hits):
+        start = time.perf_counter()
+        limiter.hit(limit, f'127.0.0.{index % keys}', 'dashboard.historic')
+        timings.append((time.perf_counter() - start) * 1000000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def hit_shared(uri, hits):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    limit = RateLimitItemPerDay(1000000)
+    for _ in range(hits):
+        limiter.hit(limit, 'shared')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hits', type=int, default=20000)
+    parser.add_argument('--keys', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'limits.mmap')
+    mmap_uri = f'mmap://{path}'
+
+    for name, uri in (('memory://', 'memory://'), ('mmap://', mmap_uri)):
+        median, p95 = measure(uri, args.hits, args.keys)
+        print(f'{name:<10} hit median {median:6.1f} us   p95 {p95:6.1f} us')
+
+    per_process = args.hits // args.processes
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=hit_shared, args=(mmap_uri, per_process))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    limiter = FixedWindowRateLimiter(storage_from_string(mmap_uri))
+    used = 1000000 - limiter.get_window_stats(RateLimitItemPerDay(1000000), 'shared').remaining
+    print(f'{args.processes} processes x {per_process} hits, shared counter {used}')
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+""" Login throughput benchmark through the Flask test client
+
+    python -m benchmarks.login [--users 20] [--logins 200] [--threads 8]
+        [--rounds 0] [--hash-workers 2]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from config import ConfigTest
+from app import create_app
+from app.extensions import db
+from app.api.models.user import UserModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=0, help='0 uses the scheme default cost')
+    parser.add_argument('--hash-workers', type=int, default=2)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite')
+
+    class BenchmarkConfig(ConfigTest):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+        SQLALCHEMY_QUERY_BUDGET = 0
+        RATELIMIT_ENABLED = False
+        PASSWORD_ROUNDS = args.rounds
+        PASSWORD_HASH_WORKERS = args.hash_workers
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        password_hash = UserModel.hash_password('password')
+        db.session.add_all([
+            UserModel(name=f'user {index}', email=f'user{index}@example.com', password=password_hash)
+            for index in range(args.users)
+        ])
+        db.session.commit()
+
+    timings = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def login(thread_index):
+        client = app.test_client()
+        for index in range(thread_index, args.logins, args.threads):
+            email = f'user{index % args.users}@example.com'
+            start = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': email, 'password': 'password'})
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                timings.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=login, args=(index,)) for index in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - start
+
+    timings.sort()
+    print(f'{args.logins} logins, {args.threads} threads, {args.hash_workers} hash workers, status {statuses}')
+    print(f'{args.logins / total:.1f} logins/s   median {statistics.median(timings):.1f} ms'
+          f'   p95 {timings[int(len(timings) * 0.95)]:.1f} ms')
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+""" Word search benchmark, in memory index against a LIKE scan
+
+    python -m benchmarks.search [--words 50000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import string
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert, or_
+
+from config import ConfigTest
+from app import create_app
+from app.extensions import db
+from app.api.models.word import WordModel
+from app.api.utils.word_search import WordSearchIndex
+
+
+def random_text(rng, size):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(size))
+
+
+def seed_words(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add(random_text(rng, rng.randint(4, 12)))
+    rows = [
+        {'name': name, 'translation': random_text(rng, rng.randint(4, 12))}
+        for name in names
+    ]
+    for start in range(0, len(rows), 5000):
+        db.session.execute(insert(WordModel), rows[start:start + 5000])
+    db.session.commit()
+    return rows
+
+
+def timed(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def like_scan(pattern):
+    return db.session.execute(
+        db.select(WordModel.id, WordModel.name, WordModel.translation)
+        .filter(or_(WordModel.name.like(pattern), WordModel.translation.like(pattern)))
+        .limit(10)
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite')
+
+    class BenchmarkConfig(ConfigTest):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+        SQLALCHEMY_QUERY_BUDGET = 0
+
+    rng = random.Random(42)
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        rows = seed_words(args.words, rng)
+        samples = [rng.choice(rows)['name'] for _ in range(args.queries)]
+        prefixes = [name[:2] for name in samples]
+        substrings = [name[1:4] for name in samples]
+
+        start = time.perf_counter()
+        index = WordSearchIndex(db.session.execute(
+            db.select(WordModel.id, WordModel.name, WordModel.translation)
+            .order_by(WordModel.id)
+        ))
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f'{args.words} words, index built in {build_ms:.0f} ms')
+
+        results = [
+            ('index prefix', timed(lambda q: index.search(q, 10), prefixes)),
+            ('LIKE prefix', timed(lambda q: like_scan(f'{q}%'), prefixes)),
+            ('index substring', timed(lambda q: index.search(q, 10), substrings)),
+            ('LIKE substring', timed(lambda q: like_scan(f'%{q}%'), substrings)),
+        ]
+        for name, (median, p95) in results:
+            print(f'{name:<16} median {median:9.1f} us   p95 {p95:9.1f} us')
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
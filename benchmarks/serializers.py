@@ -0,0 +1,123 @@
+""" List serialization benchmark, ORM objects dumped by the marshmallow
+schemas against the row tuples of fast_serializers, on the same page of
+rows. The JSON of both paths must be byte for byte the same
+
+    python -m benchmarks.serializers [--words 5000] [--tags 200] [--sets 300]
+        [--limit 1000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import selectinload
+
+from config import ConfigTest
+from app import create_app
+from app.extensions import db
+from app.api.models.word import TagModel, WordModel, SetModel, tags_words, sets_words
+from app.api.schemas.word import TagSchema, WordSchemaOutPut, SetWordsSchema
+from app.api.utils.fast_serializers import dump_tags_page, dump_words_page, dump_sets_page
+from app.api.utils.json_output import encode
+from app.api.utils.pagination import paginate
+
+
+def random_text(rng, size):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(size))
+
+
+def seed(rng, words, tags, sets):
+    db.session.execute(insert(TagModel), [{'name': f'tag {index}'} for index in range(tags)])
+    db.session.execute(insert(WordModel), [
+        {
+            'name': f'{random_text(rng, rng.randint(3, 9))}{index}',
+            'translation': random_text(rng, rng.randint(4, 12)),
+            'annotation': random_text(rng, 20) if index % 3 == 0 else None,
+        }
+        for index in range(words)
+    ])
+    db.session.execute(insert(tags_words), [
+        {'word_id': word_id, 'tag_id': tag_id}
+        for word_id in range(1, words + 1)
+        for tag_id in rng.sample(range(1, tags + 1), 3)
+    ])
+    db.session.execute(insert(SetModel), [{'name': f'set {index}'} for index in range(sets)])
+    db.session.execute(insert(sets_words), [
+        {'set_id': set_id, 'word_id': word_id}
+        for set_id in range(1, sets + 1)
+        for word_id in rng.sample(range(1, words + 1), 20)
+    ])
+    db.session.commit()
+
+
+def orm_tags(limit):
+    tags, _ = paginate(TagModel.query, TagModel.id, limit)
+    return TagSchema(many=True).dump(tags)
+
+
+def orm_words(limit):
+    query = WordModel.query.options(selectinload(WordModel.tags))
+    words, _ = paginate(query, WordModel.id, limit)
+    return WordSchemaOutPut(many=True, exclude=('sets',)).dump(words)
+
+
+def orm_sets(limit):
+    query = SetModel.query.options(selectinload(SetModel.words))
+    sets, _ = paginate(query, SetModel.id, limit)
+    return SetWordsSchema(many=True).dump(sets)
+
+
+def timed(fn, limit, repeat):
+    """ Milliseconds to read and encode a page, the session is cleared
+    before each run so the ORM path loads its objects again """
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        body = encode(fn(limit))
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), statistics.median(timings), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=5000)
+    parser.add_argument('--tags', type=int, default=200)
+    parser.add_argument('--sets', type=int, default=300)
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite')
+
+    class BenchmarkConfig(ConfigTest):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+        SQLALCHEMY_QUERY_BUDGET = 0
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        seed(random.Random(42), args.words, max(args.tags, 3), args.sets)
+
+        pages = [
+            ('tags', orm_tags, lambda limit: dump_tags_page(limit)[0]),
+            ('words', orm_words, lambda limit: dump_words_page(limit)[0]),
+            ('sets', orm_sets, lambda limit: dump_sets_page(limit)[0]),
+        ]
+        for name, orm_page, fast_page in pages:
+            orm_min, orm_median, orm_body = timed(orm_page, args.limit, args.repeat)
+            fast_min, fast_median, fast_body = timed(fast_page, args.limit, args.repeat)
+            assert orm_body == fast_body, f'{name}: the JSON of both paths differs'
+            print(f'{name:<6} ORM median {orm_median:8.2f} ms (min {orm_min:8.2f})'
+                  f'   rows median {fast_median:8.2f} ms (min {fast_min:8.2f})'
+                  f'   x{orm_median / fast_median:5.1f}   {len(fast_body)} identical bytes')
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
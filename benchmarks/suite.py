@@ -0,0 +1,417 @@
+""" Latency and throughput of the endpoints of every namespace through the
+Flask test client on a synthetic dataset. The results are written as JSON,
+--compare reads the file of a previous run and fails when an endpoint
+median got slower than --threshold times
+
+    python -m benchmarks.suite [--words 100000] [--tags 5000] [--users 10000]
+        [--sets 1000] [--historics 1000000] [--days 365] [--sessions 20]
+        [--requests 200] [--warmup 10] [--seed 42] [--database-uri URI]
+        [--output benchmark-results.json] [--compare OLD.json] [--threshold 1.2]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy
+from sqlalchemy import insert
+
+from config import ConfigTest
+from app import create_app
+from app.extensions import db
+from app.api.models.user import UserModel
+from app.api.models.word import (
+    TagModel, WordModel, SetModel, HistoricHitsModel, UserDailyStatsModel,
+    UserWordStatsModel, ReviewScheduleModel, tags_words, sets_words,
+)
+from app.api.utils.date_window import get_date_window
+
+
+SEED_CHUNK_SIZE = 10000
+PASSWORD = 'password'
+# exports read the whole table, they run this fraction of --requests
+HEAVY_REQUESTS_DIVISOR = 20
+
+
+def random_text(rng, size):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(size))
+
+
+def insert_rows(table, rows):
+    """ Insert an iterable of rows in executemany chunks, returns the count """
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == SEED_CHUNK_SIZE:
+            db.session.execute(insert(table), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(table), chunk)
+        count += len(chunk)
+    db.session.commit()
+    return count
+
+
+def seed(args, rng):
+    """ Synthetic dataset, ids are assigned in insert order from 1 """
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        timings[name] = round(time.perf_counter() - start, 3)
+        return result
+
+    password_hash = UserModel.hash_password(PASSWORD)
+    timed('users', lambda: insert_rows(UserModel, (
+        {
+            'name': f'user {index}',
+            'email': f'user{index}@example.com',
+            'password': password_hash,
+            'is_admin': index == 0,
+        }
+        for index in range(args.users)
+    )))
+    timed('tags', lambda: insert_rows(TagModel, (
+        {'name': f'tag {index}'} for index in range(args.tags)
+    )))
+    # the index suffix keeps the names unique
+    timed('words', lambda: insert_rows(WordModel, (
+        {
+            'name': f'{random_text(rng, rng.randint(3, 9))}{index}',
+            'translation': random_text(rng, rng.randint(4, 12)),
+        }
+        for index in range(args.words)
+    )))
+    if args.tags:
+        timed('tags_words', lambda: insert_rows(tags_words, (
+            {'word_id': word_id, 'tag_id': tag_id}
+            for word_id in range(1, args.words + 1)
+            for tag_id in rng.sample(range(1, args.tags + 1), min(rng.randint(0, 3), args.tags))
+        )))
+    timed('sets', lambda: insert_rows(SetModel, (
+        {'name': f'set {index}'} for index in range(args.sets)
+    )))
+    timed('sets_words', lambda: insert_rows(sets_words, (
+        {'set_id': set_id, 'word_id': word_id}
+        for set_id in range(1, args.sets + 1)
+        for word_id in rng.sample(range(1, args.words + 1), min(rng.randint(10, 100), args.words))
+    )))
+
+    today = get_date_window().today
+    dates = [today - timedelta(days=day) for day in range(args.days)]
+    timed('history_hits', lambda: insert_rows(HistoricHitsModel, (
+        {
+            'id_user': rng.randint(1, args.users),
+            'id_word': rng.randint(1, args.words),
+            'hit': rng.random() < 0.7,
+            'date': rng.choice(dates),
+        }
+        for _ in range(args.historics)
+    )))
+    timed('user_daily_stats', UserDailyStatsModel.rebuild)
+    timed('user_word_stats', UserWordStatsModel.rebuild)
+    timed('review_schedules', ReviewScheduleModel.rebuild)
+    return timings
+
+
+def login(client, email):
+    response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f'login of {email} failed with status {response.status_code}')
+    return response.json
+
+
+def build_endpoints(args, rng, admin, sessions):
+    """ (namespace, name, method, build, keep, heavy), build(index) returns
+    the url and the client options of the request, keep(response) sees
+    the measured responses """
+    today = get_date_window().today
+    admin_headers = {'Authorization': f'Bearer {admin["access_token"]}'}
+    created = {'words': [], 'tags': [], 'sets': []}
+
+    def user_headers(index):
+        return {'Authorization': f'Bearer {sessions[index % len(sessions)]["access_token"]}'}
+
+    def get(url):
+        return lambda index: (url(index), {'headers': user_headers(index)})
+
+    def admin_get(url):
+        return lambda index: (url(index), {'headers': admin_headers})
+
+    def admin_json(url, body):
+        return lambda index: (url(index), {'headers': admin_headers, 'json': body(index)})
+
+    def keep_id(name):
+        def keep(response):
+            if response.status_code == 201:
+                created[name].append(response.json['id'])
+        return keep
+
+    def pop_id(name, prefix):
+        def url(index):
+            return f'{prefix}{created[name].pop() if created[name] else 0}'
+        return url
+
+    def word_id(index):
+        return rng.randint(1, args.words)
+
+    def search_term(index):
+        return random_text(rng, rng.randint(1, 3))
+
+    run_id = random_text(rng, 6)
+    return [
+        ('auth', 'login', 'POST', lambda index: ('/api/auth/login', {'json': {
+            'email': f'user{rng.randint(1, len(sessions))}@example.com', 'password': PASSWORD,
+        }}), None, False),
+        ('auth', 'refresh', 'POST', lambda index: ('/api/auth/refresh', {'headers': {
+            'Authorization': f'Bearer {sessions[index % len(sessions)]["refresh_token"]}',
+        }}), None, False),
+
+        ('health', 'health_check', 'GET', lambda index: ('/api/health/health_check', {}), None, False),
+        ('health', 'db', 'GET', admin_get(lambda index: '/api/health/db'), None, False),
+
+        ('users', 'list', 'GET', admin_get(
+            lambda index: f'/api/users/?limit=50&after={rng.randint(0, args.users)}'), None, False),
+        ('users', 'get', 'GET', admin_get(
+            lambda index: f'/api/users/{rng.randint(1, args.users)}'), None, False),
+        ('users', 'roles', 'GET', get(lambda index: '/api/users/roles'), None, False),
+        ('users', 'create', 'POST', lambda index: ('/api/users/', {'json': {
+            'name': f'bench {index}', 'email': f'bench-{run_id}-{index}@example.com',
+            'password': PASSWORD,
+        }}), None, False),
+        ('users', 'update_me', 'PUT', lambda index: ('/api/users/me', {
+            'headers': user_headers(index),
+            'json': {'name': f'user {index % len(sessions) + 1}',
+                     'email': f'user{index % len(sessions) + 1}@example.com'},
+        }), None, False),
+
+        ('words', 'list', 'GET', get(
+            lambda index: f'/api/words/?limit=50&after={rng.randint(0, args.words)}'), None, False),
+        ('words', 'get', 'GET', get(lambda index: f'/api/words/{word_id(index)}'), None, False),
+        ('words', 'search', 'GET', get(lambda index: f'/api/words/search?q={search_term(index)}'), None, False),
+        ('words', 'export', 'GET', get(lambda index: '/api/words/export'), None, True),
+        ('words', 'create', 'POST', admin_json(lambda index: '/api/words/', lambda index: {
+            'name': f'bench{run_id}{index}', 'translation': random_text(rng, 8),
+            'tags': [rng.randint(1, args.tags)] if args.tags else [],
+        }), keep_id('words'), False),
+        ('words', 'update', 'PUT', admin_json(
+            lambda index: f'/api/words/{created["words"][index % len(created["words"])]}',
+            lambda index: {'name': f'bench{run_id}u{index}', 'translation': random_text(rng, 8)}),
+            None, False),
+        ('words', 'delete', 'DELETE', admin_get(pop_id('words', '/api/words/')), None, False),
+
+        ('tags', 'list', 'GET', get(
+            lambda index: f'/api/tags/?limit=50&after={rng.randint(0, args.tags)}'), None, False),
+        ('tags', 'get', 'GET', get(lambda index: f'/api/tags/{rng.randint(1, args.tags)}'), None, False),
+        ('tags', 'sample', 'GET', get(
+            lambda index: f'/api/tags/{rng.randint(1, args.tags)}/sample?n=20'), None, False),
+        ('tags', 'create', 'POST', admin_json(
+            lambda index: '/api/tags/', lambda index: {'name': f'bench {run_id} {index}'}),
+            keep_id('tags'), False),
+        ('tags', 'delete', 'DELETE', admin_get(pop_id('tags', '/api/tags/')), None, False),
+
+        ('set_words', 'list', 'GET', get(
+            lambda index: f'/api/set_words/?limit=50&after={rng.randint(0, args.sets)}'), None, False),
+        ('set_words', 'get', 'GET', get(
+            lambda index: f'/api/set_words/{rng.randint(1, args.sets)}'), None, False),
+        ('set_words', 'words', 'GET', get(
+            lambda index: f'/api/set_words/words/{rng.randint(1, args.sets)}'), None, False),
+        ('set_words', 'sample', 'GET', get(
+            lambda index: f'/api/set_words/{rng.randint(1, args.sets)}/sample?n=20'), None, False),
+        ('set_words', 'create', 'POST', admin_json(lambda index: '/api/set_words/', lambda index: {
+            'name': f'bench {run_id} {index}', 'words': [word_id(index) for _ in range(20)],
+        }), keep_id('sets'), False),
+        ('set_words', 'update', 'PUT', admin_json(
+            lambda index: f'/api/set_words/{created["sets"][index % len(created["sets"])]}',
+            lambda index: {'name': f'bench {run_id} updated {index}',
+                           'words': [word_id(index) for _ in range(20)]}), None, False),
+        ('set_words', 'delete', 'DELETE', admin_get(pop_id('sets', '/api/set_words/')), None, False),
+
+        # the dashboard is cached per user until a new historic, a session
+        # pays the queries on its first request of each endpoint
+        ('dashboard', 'total_hits_last_30days', 'GET', get(
+            lambda index: '/api/dashboard/total_hits_last_30days'), None, False),
+        ('dashboard', 'historic_by_day', 'GET', get(
+            lambda index: f'/api/dashboard/historic_by_day/{today - timedelta(days=rng.randint(1, 30))}'),
+            None, False),
+        ('dashboard', 'top10_wrong_words', 'GET', get(
+            lambda index: '/api/dashboard/top10_wrong_words_by_user'), None, False),
+        ('dashboard', 'historic_90days', 'GET', get(
+            lambda index: '/api/dashboard/historic_90days_by_user'), None, False),
+        ('dashboard', 'summary', 'GET', get(lambda index: '/api/dashboard/summary'), None, False),
+        ('dashboard', 'due', 'GET', get(lambda index: '/api/dashboard/due'), None, False),
+        ('dashboard', 'export', 'GET', get(lambda index: '/api/dashboard/export'), None, True),
+        ('dashboard', 'create_historic', 'POST', lambda index: ('/api/dashboard/create_historic', {
+            'headers': user_headers(index),
+            'json': {'historics': [
+                {'id_word': word_id(index), 'hit': rng.random() < 0.7} for _ in range(20)
+            ]},
+        }), None, False),
+    ]
+
+
+def measure(client, method, build, keep, requests, warmup):
+    timings = []
+    statuses = Counter()
+    for index in range(warmup + requests):
+        url, options = build(index)
+        start = time.perf_counter()
+        response = client.open(url, method=method, **options)
+        # streamed responses are timed until their last chunk
+        response.get_data()
+        elapsed = time.perf_counter() - start
+        if keep:
+            keep(response)
+        response.close()
+        if index >= warmup:
+            timings.append(elapsed * 1000)
+            statuses[response.status_code] += 1
+
+    timings.sort()
+    total = sum(timings) / 1000
+    return {
+        'requests': requests,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': sum(count for status, count in statuses.items() if status >= 400),
+        'throughput_rps': round(requests / total, 1) if total else 0,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[int(len(timings) * 0.95)], 3),
+        'p99_ms': round(timings[int(len(timings) * 0.99)], 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, path, threshold):
+    """ Print the median ratio of each endpoint against a previous run,
+    returns the keys slower than threshold """
+    with open(path) as file:
+        previous = {result['key']: result for result in json.load(file)['results']}
+
+    slower = []
+    print(f'\ncompared with {path}')
+    for result in results:
+        old = previous.get(result['key'])
+        if not old or not old['median_ms']:
+            continue
+        ratio = result['median_ms'] / old['median_ms']
+        flag = ''
+        if ratio > threshold:
+            slower.append(result['key'])
+            flag = '  SLOWER'
+        print(f'{result["key"]:<44} {old["median_ms"]:9.2f} -> {result["median_ms"]:9.2f} ms'
+              f'   x{ratio:5.2f}{flag}')
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=100000)
+    parser.add_argument('--tags', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--sets', type=int, default=1000)
+    parser.add_argument('--historics', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=365, help='historics are spread over the last days')
+    parser.add_argument('--sessions', type=int, default=20, help='users logged in to make the requests')
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-uri', help='empty database, a temporary SQLite file by default')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+    args.sessions = max(1, min(args.sessions, args.users - 1))
+
+    path = None
+    database_uri = args.database_uri
+    if database_uri is None:
+        path = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite')
+        database_uri = 'sqlite:///' + path
+
+    class BenchmarkConfig(ConfigTest):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SQLALCHEMY_QUERY_BUDGET = 0
+        RATELIMIT_ENABLED = False
+
+    rng = random.Random(args.seed)
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        seed_timings = seed(args, rng)
+        seed_seconds = round(time.perf_counter() - start, 3)
+        dialect = db.engine.dialect.name
+    print(f'dataset seeded in {seed_seconds:.1f} s {seed_timings}')
+
+    client = app.test_client()
+    admin = login(client, 'user0@example.com')
+    sessions = [login(client, f'user{index}@example.com') for index in range(1, args.sessions + 1)]
+
+    results = []
+    for namespace, name, method, build, keep, heavy in build_endpoints(args, rng, admin, sessions):
+        requests = max(1, args.requests // HEAVY_REQUESTS_DIVISOR) if heavy else args.requests
+        warmup = min(args.warmup, requests)
+        result = measure(client, method, build, keep, requests, warmup)
+        result = {'key': f'{namespace} {method} {name}', 'namespace': namespace,
+                  'name': name, 'method': method, **result}
+        results.append(result)
+        print(f'{result["key"]:<44} median {result["median_ms"]:9.2f} ms   p95 {result["p95_ms"]:9.2f} ms'
+              f'   {result["throughput_rps"]:8.1f} req/s   status {result["statuses"]}')
+
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': platform.platform(),
+            'database': dialect,
+        },
+        'dataset': {
+            'words': args.words, 'tags': args.tags, 'users': args.users, 'sets': args.sets,
+            'historics': args.historics, 'days': args.days, 'seed': args.seed,
+        },
+        'run': {'sessions': args.sessions, 'requests': args.requests, 'warmup': args.warmup},
+        'seed_seconds': seed_seconds,
+        'seed_timings': seed_timings,
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'results written to {args.output}')
+
+    if path:
+        os.remove(path)
+
+    if args.compare:
+        slower = compare(results, args.compare, args.threshold)
+        if slower:
+            print(f'{len(slower)} endpoints slower than x{args.threshold}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,13 @@
+import json
+
 import click
 from flask.cli import with_appcontext
 
 from app.api.models.user import UserModel
+from app.api.models.word import UserDailyStatsModel, UserWordStatsModel, ReviewScheduleModel
 from app.extensions import db
 from app.api.schemas.user import UserSchema 
+from app.api.utils.word_import import import_words, read_words_csv
 
 
 @click.command("create-user-admin")
@@ -26,5 +30,46 @@ def create_user_admin(name, email, password):
         db.session.commit()
         click.echo("User admin created")
 
+@click.command("rebuild-daily-stats")
+@click.option("--user-id", type=int, default=None, help="Rebuild only this user")
+@with_appcontext
+def rebuild_daily_stats(user_id):
+    UserDailyStatsModel.rebuild(user_id)
+    click.echo("Daily stats rebuilt")
+
+@click.command("rebuild-word-stats")
+@click.option("--user-id", type=int, default=None, help="Rebuild only this user")
+@with_appcontext
+def rebuild_word_stats(user_id):
+    UserWordStatsModel.rebuild(user_id)
+    click.echo("Word stats rebuilt")
+
+@click.command("rebuild-review-schedules")
+@click.option("--user-id", type=int, default=None, help="Rebuild only this user")
+@with_appcontext
+def rebuild_review_schedules(user_id):
+    ReviewScheduleModel.rebuild(user_id)
+    click.echo("Review schedules rebuilt")
+
+@click.command("import-words")
+@click.argument("file", type=click.File(encoding="utf-8-sig"))
+@with_appcontext
+def import_words_file(file):
+    """ Import words from a .csv or .json file """
+    if file.name.endswith('.csv'):
+        rows = read_words_csv(file.read())
+    else:
+        rows = json.load(file)
+        if isinstance(rows, dict):
+            rows = rows.get('words', [])
+    result = import_words(rows)
+    for error in result['errors']:
+        click.echo(f"Row {error['row']} ({error['name']}): {error['message']}")
+    click.echo(f"{result['created']} words imported")
+
 def init_app(app):
-    app.cli.add_command(create_user_admin)
\ No newline at end of file
+    app.cli.add_command(create_user_admin)
+    app.cli.add_command(rebuild_daily_stats)
+    app.cli.add_command(rebuild_word_stats)
+    app.cli.add_command(rebuild_review_schedules)
+    app.cli.add_command(import_words_file)
\ No newline at end of file
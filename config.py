@@ -8,22 +8,56 @@ load_dotenv()
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def get_engine_options():
+    """ Connection pool of the engine, the defaults suit a production database """
+    return {
+        'pool_size': int(os.getenv('SQLALCHEMY_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.getenv('SQLALCHEMY_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('SQLALCHEMY_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('SQLALCHEMY_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+
 class ConfigBase:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.getenv('HOURS_TO_JWT_ACCESS_TOKEN_EXPIRES')))
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(hours=int(os.getenv('HOURS_TO_JWT_REFRESH_TOKEN_EXPIRES')))
     PROPAGATE_EXCEPTIONS = True
     RESTX_MASK_SWAGGER = False
+    # json keeps the stdlib output, orjson is faster but compact and not ASCII escaped
+    RESTX_JSON_BACKEND = os.getenv('RESTX_JSON_BACKEND', 'json')
+    # Server-Timing header and a JSON log line with the timings of each request
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'false').lower() == 'true'
+    # first scheme hashes new passwords, the others are rehashed on login
+    PASSWORD_SCHEMES = os.getenv('PASSWORD_SCHEMES', 'sha512_crypt,sha256_crypt')
+    PASSWORD_ROUNDS = int(os.getenv('PASSWORD_ROUNDS', 0))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # seconds a worker trusts its copy of a user's token epoch
+    TOKEN_EPOCH_REFRESH_SECONDS = int(os.getenv('TOKEN_EPOCH_REFRESH_SECONDS', 5))
+    HEALTH_DB_PROBE_TTL = int(os.getenv('HEALTH_DB_PROBE_TTL', 10))
+    # memory: index kept by each worker, pg_trgm: ILIKE on the PostgreSQL trigram indexes
+    WORD_SEARCH_BACKEND = os.getenv('WORD_SEARCH_BACKEND', 'memory')
+    # direct: each request commits its historics, buffered: a flusher thread writes them
+    HISTORIC_INGESTION = os.getenv('HISTORIC_INGESTION', 'direct')
+    HISTORIC_ACK = os.getenv('HISTORIC_ACK', 'async')
+    HISTORIC_ACK_TIMEOUT = int(os.getenv('HISTORIC_ACK_TIMEOUT', 10))
+    HISTORIC_BUFFER_MAX_ROWS = int(os.getenv('HISTORIC_BUFFER_MAX_ROWS', 10000))
+    HISTORIC_FLUSH_ROWS = int(os.getenv('HISTORIC_FLUSH_ROWS', 500))
+    HISTORIC_FLUSH_INTERVAL_MS = int(os.getenv('HISTORIC_FLUSH_INTERVAL_MS', 200))
 
 
 class Config(ConfigBase):
     DEBUG = os.getenv('DEBUG').lower() == "true"
     SECRET_KEY = os.getenv('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
+    SQLALCHEMY_ENGINE_OPTIONS = get_engine_options()
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI')
     CACHE_TYPE = os.getenv('CACHE_TYPE')
     CORS_ORIGINS = os.getenv('CORS_ORIGINS').split(',')
+    SQLALCHEMY_QUERY_BUDGET = int(os.getenv('SQLALCHEMY_QUERY_BUDGET', 0))
 
 
 class ConfigTest(ConfigBase):
@@ -35,4 +69,6 @@ class ConfigTest(ConfigBase):
     RATELIMIT_STORAGE_URI = 'memory://'
     CACHE_TYPE = 'flask_caching.backends.SimpleCache'
     CORS_ORIGINS = '*'
+    SQLALCHEMY_QUERY_BUDGET = 10
+    PASSWORD_ROUNDS = 1000
     
\ No newline at end of file
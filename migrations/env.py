@@ -90,9 +90,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the pg_trgm indexes of the words search are created by a migration
+    # only on postgresql and are not declared in the models
+    def include_object(object, name, type_, reflected, compare_to):
+        if type_ == 'index' and reflected and name.endswith('_trgm'):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
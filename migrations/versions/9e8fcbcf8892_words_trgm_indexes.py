@@ -0,0 +1,44 @@
+"""words trgm indexes
+
+Revision ID: 9e8fcbcf8892
+Revises: 5e866ffc2f0e
+Create Date: 2026-10-18 07:32:54.829265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e8fcbcf8892'
+down_revision = '5e866ffc2f0e'
+branch_labels = None
+depends_on = None
+
+
+# trigram indexes used by WORD_SEARCH_BACKEND=pg_trgm, only on PostgreSQL
+TRGM_INDEXES = {
+    'ix_words_name_trgm': 'name',
+    'ix_words_translation_trgm': 'translation',
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRGM_INDEXES.items():
+        op.create_index(
+            name, 'words', [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name in TRGM_INDEXES:
+        op.drop_index(name, table_name='words')
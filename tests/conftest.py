@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+# config.py reads these on import, the tests run without a .env file
+os.environ.setdefault('HOURS_TO_JWT_ACCESS_TOKEN_EXPIRES', '1')
+os.environ.setdefault('HOURS_TO_JWT_REFRESH_TOKEN_EXPIRES', '24')
+os.environ.setdefault('DEBUG', 'false')
+os.environ.setdefault('CORS_ORIGINS', '*')
+
+from flask_jwt_extended import create_access_token
+
+from config import ConfigTest
+from app import create_app
+from app.extensions import db, cache
+from app.api.models.user import UserModel
+from app.api.utils.token_epochs import token_epochs
+
+
+@pytest.fixture
+def app_config():
+    """ Settings read when the app is created, overridden by a module """
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, app_config):
+    """ App on an empty database, TEST_DATABASE_URI runs the tests against
+    another empty database such as PostgreSQL """
+    class TestConfig(ConfigTest):
+        SQLALCHEMY_DATABASE_URI = os.getenv(
+            'TEST_DATABASE_URI', 'sqlite:///' + str(tmp_path / 'test.sqlite')
+        )
+        RATELIMIT_ENABLED = False
+
+    for key, value in app_config.items():
+        setattr(TestConfig, key, value)
+
+    # table versions live in the cache, a fresh directory per test keeps
+    # the worker caches keyed on them from serving another test's rows
+    monkeypatch.setitem(cache.config, 'CACHE_DIR', str(tmp_path / 'cache'))
+    token_epochs.invalidate()
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def admin(app):
+    user = UserModel(
+        name='admin user',
+        email='admin@example.com',
+        password=UserModel.hash_password('password'),
+        is_admin=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin_headers(admin):
+    token = create_access_token(
+        identity=admin.id,
+        additional_claims={'is_admin': True, 'roles': [], 'epoch': admin.token_epoch},
+    )
+    return {'Authorization': f'Bearer {token}'}
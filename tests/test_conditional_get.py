@@ -0,0 +1,37 @@
+""" Catalogue lists answer 304 until a write moves their version """
+import pytest
+
+from app.extensions import db
+from app.api.models.word import SetModel, TagModel, WordModel
+from app.api.utils.cache_versions import bump_version, get_version
+
+
+@pytest.mark.parametrize('url, new_row', [
+    ('/api/words/', lambda: WordModel(name='casa', translation='house')),
+    ('/api/tags/', lambda: TagModel(name='home')),
+    ('/api/set_words/', lambda: SetModel(name='basics')),
+])
+def test_write_changes_the_etag(client, admin_headers, url, new_row):
+    first = client.get(url, headers=admin_headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    cached = client.get(url, headers={**admin_headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+
+    db.session.add(new_row())
+    db.session.commit()
+
+    changed = client.get(url, headers={**admin_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert len(changed.json['items']) == 1
+
+
+def test_each_bump_hands_out_a_new_version(app):
+    versions = {get_version('words')}
+    for _ in range(20):
+        bump_version('words')
+        versions.add(get_version('words'))
+    assert len(versions) == 21
@@ -0,0 +1,46 @@
+""" The summary endpoint answers what the four dashboard widgets answer
+for the same user and date """
+from datetime import timedelta
+
+from app.extensions import db
+from app.api.models.word import HistoricHitsModel, WordModel
+from app.api.utils.date_window import get_date_window
+
+
+def test_summary_matches_the_widgets(client, admin, admin_headers):
+    # the (id_user, errors) index is read backwards, ties would come last
+    # id first without the order on the word
+    words = [WordModel(name=f'word {index:02}', translation='translation') for index in range(14)]
+    db.session.add_all(words)
+    db.session.commit()
+    word_ids = [word.id for word in words]
+    today = get_date_window().today
+
+    historics = []
+    for index, id_word in enumerate(word_ids):
+        # two errors for most words, the top10 cut falls inside the tie
+        errors = 3 if index % 5 == 0 else 2
+        for days_ago in range(errors):
+            historics.append({'id_user': admin.id, 'id_word': id_word, 'hit': False,
+                              'date': today - timedelta(days=days_ago * 20 + index)})
+        historics.append({'id_user': admin.id, 'id_word': id_word, 'hit': True,
+                          'date': today - timedelta(days=index)})
+    HistoricHitsModel.bulk_create_historics(historics)
+
+    day = (today - timedelta(days=3)).isoformat()
+    summary = client.get(f'/api/dashboard/summary?date={day}', headers=admin_headers)
+    assert summary.status_code == 200
+    widgets = {
+        'total_hits_last_30days': '/api/dashboard/total_hits_last_30days',
+        'historic_by_day': f'/api/dashboard/historic_by_day/{day}',
+        'top10_wrong_words': '/api/dashboard/top10_wrong_words_by_user',
+        'historic_90days': '/api/dashboard/historic_90days_by_user',
+    }
+    for key, url in widgets.items():
+        response = client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        assert summary.json[key] == response.json, key
+
+    top = summary.json['top10_wrong_words']
+    assert len(top) == 10
+    assert top == sorted(top, key=lambda word: (-word['count'], word['word']))
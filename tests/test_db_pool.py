@@ -0,0 +1,60 @@
+""" The engine pool built from the SQLALCHEMY_POOL_* settings honours its
+size, overflow, timeout and recycle """
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+from config import get_engine_options
+from app.extensions import db
+from app.api.utils.db_pool import TimedQueuePool, get_pool_stats
+
+
+@pytest.fixture
+def app_config(monkeypatch):
+    monkeypatch.setenv('SQLALCHEMY_POOL_SIZE', '2')
+    monkeypatch.setenv('SQLALCHEMY_MAX_OVERFLOW', '1')
+    monkeypatch.setenv('SQLALCHEMY_POOL_TIMEOUT', '1')
+    monkeypatch.setenv('SQLALCHEMY_POOL_RECYCLE', '3600')
+    return {'SQLALCHEMY_ENGINE_OPTIONS': get_engine_options()}
+
+
+def test_settings_reach_the_engine_pool(app):
+    pool = db.engine.pool
+
+    assert isinstance(pool, TimedQueuePool)
+    assert (pool.size(), pool._max_overflow, pool._timeout, pool._recycle) == (2, 1, 1, 3600)
+    assert pool._pre_ping
+
+
+def test_checkouts_over_size_and_overflow_time_out(app):
+    db.session.remove()
+    connections = [db.engine.connect() for _ in range(3)]
+    stats = get_pool_stats()
+    assert (stats['checked_out'], stats['overflow']) == (3, 1)
+
+    start = time.perf_counter()
+    with pytest.raises(exc.TimeoutError):
+        db.engine.connect()
+    assert 1 <= time.perf_counter() - start < 3
+    assert get_pool_stats()['wait']['timeouts'] == 1
+
+    for connection in connections:
+        connection.close()
+    with db.engine.connect():
+        assert get_pool_stats()['checked_out'] == 1
+
+
+def test_connections_are_recycled(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path}/recycle.sqlite', poolclass=TimedQueuePool,
+                           pool_size=1, max_overflow=0, pool_recycle=1)
+
+    def dbapi_connection():
+        with engine.connect() as connection:
+            return connection.connection.dbapi_connection
+
+    first = dbapi_connection()
+    assert dbapi_connection() is first
+    time.sleep(1.1)
+    assert dbapi_connection() is not first
+    engine.dispose()
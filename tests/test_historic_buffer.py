@@ -0,0 +1,67 @@
+""" Failures of the historic flusher are reported to the waiting requests
+and never leave the buffer without a running thread """
+import pytest
+
+from app.extensions import db
+from app.api.models.word import HistoricHitsModel, WordModel
+from app.api.utils.historic_buffer import HistoricBuffer, HistoricFlushError
+
+
+@pytest.fixture
+def buffer(app):
+    app.config.update(
+        HISTORIC_INGESTION='buffered',
+        HISTORIC_ACK='sync',
+        HISTORIC_ACK_TIMEOUT=5,
+        HISTORIC_FLUSH_INTERVAL_MS=10,
+    )
+    buffer = HistoricBuffer(app)
+    yield buffer
+    buffer.stop()
+
+
+@pytest.fixture
+def historics(admin):
+    word = WordModel(name='word', translation='translation')
+    db.session.add(word)
+    db.session.commit()
+    return HistoricHitsModel.build_historics([{'id_word': word.id, 'hit': True}], admin.id)
+
+
+def stored_count():
+    db.session.remove()
+    return db.session.query(HistoricHitsModel).count()
+
+
+def test_unexpected_flush_error_is_reported_and_the_flusher_keeps_running(buffer, historics,
+                                                                          monkeypatch):
+    def fail(rows):
+        raise RuntimeError('cache unavailable')
+
+    monkeypatch.setattr(HistoricHitsModel, 'bulk_create_historics', fail)
+    with pytest.raises(HistoricFlushError, match='cache unavailable'):
+        buffer.submit(historics)
+    assert buffer._thread.is_alive()
+
+    monkeypatch.undo()
+    buffer.submit(historics)
+    assert stored_count() == 1
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_dead_flusher_is_restarted(buffer, historics, monkeypatch):
+    buffer.submit(historics)
+    thread = buffer._thread
+
+    def die():
+        raise RuntimeError('flusher died')
+
+    monkeypatch.setattr(buffer, '_take_batches', die)
+    thread.join(5)
+    assert not thread.is_alive()
+
+    monkeypatch.undo()
+    buffer.submit(historics)
+    assert buffer._thread is not thread
+    assert buffer._thread.is_alive()
+    assert stored_count() == 2
@@ -0,0 +1,34 @@
+""" Responses keep the stdlib json formatting unless orjson is opted in """
+import json
+
+from app.extensions import db
+from app.api.models.word import WordModel
+
+
+def test_default_backend_keeps_the_stdlib_output(app, client, admin_headers):
+    word = WordModel(name='maçã', translation='apple')
+    db.session.add(word)
+    db.session.commit()
+
+    response = client.get(f'/api/words/{word.id}', headers=admin_headers)
+
+    assert app.config['RESTX_JSON_BACKEND'] == 'json'
+    # flask-restx indents the debug output
+    expected = json.dumps({'tags': [], 'id': word.id, 'name': 'maçã',
+                           'translation': 'apple', 'annotation': None},
+                          indent=4 if app.debug else None)
+    assert response.get_data(as_text=True) == expected + '\n'
+
+
+def test_orjson_backend_encodes_the_same_data(app, client, admin_headers):
+    app.config['RESTX_JSON_BACKEND'] = 'orjson'
+    # the debug indentation goes through the stdlib json
+    app.debug = False
+    word = WordModel(name='maçã', translation='apple')
+    db.session.add(word)
+    db.session.commit()
+
+    response = client.get(f'/api/words/{word.id}', headers=admin_headers)
+
+    assert response.json['name'] == 'maçã'
+    assert 'maçã'.encode('utf-8') in response.get_data()
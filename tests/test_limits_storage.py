@@ -0,0 +1,82 @@
+""" Rate limit counters of the mmap storage, shared by the processes that
+open the same file """
+import multiprocessing
+import time
+
+import pytest
+from limits import RateLimitItemPerMinute, RateLimitItemPerSecond
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+
+from app.limits_storage import MmapStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return storage_from_string(f'mmap://{tmp_path}/limits')
+
+
+def test_uri_selects_the_mmap_storage(storage):
+    assert isinstance(storage, MmapStorage)
+    assert storage.check()
+
+
+def test_fixed_window_counts_and_expires(storage):
+    limiter = FixedWindowRateLimiter(storage)
+    limit = RateLimitItemPerSecond(3, 1)
+
+    assert [limiter.hit(limit, 'user') for _ in range(4)] == [True, True, True, False]
+    assert limiter.get_window_stats(limit, 'user').remaining == 0
+    # other keys have their own counter
+    assert limiter.hit(limit, 'other')
+
+    time.sleep(1.1)
+    assert limiter.test(limit, 'user')
+    assert storage.get(limit.key_for('user')) == 0
+    assert limiter.hit(limit, 'user')
+
+
+def test_clear_and_reset(storage):
+    limiter = FixedWindowRateLimiter(storage)
+    limit = RateLimitItemPerMinute(1)
+    limiter.hit(limit, 'first')
+    limiter.hit(limit, 'second')
+    assert not limiter.hit(limit, 'first')
+
+    limiter.clear(limit, 'first')
+    assert limiter.hit(limit, 'first')
+    assert not limiter.hit(limit, 'second')
+
+    assert storage.reset() == 2
+    assert limiter.hit(limit, 'first') and limiter.hit(limit, 'second')
+
+
+def test_full_table_evicts_the_slot_closest_to_expire(tmp_path):
+    storage = MmapStorage(f'mmap://{tmp_path}/limits?slots=4')
+    storage.incr('soon', 10)
+    for key in ('a', 'b', 'c'):
+        storage.incr(key, 100)
+        storage.incr(key, 100)
+
+    assert storage.incr('new', 100) == 1
+    assert storage.get('soon') == 0
+    assert [storage.get(key) for key in ('a', 'b', 'c', 'new')] == [2, 2, 2, 1]
+
+
+def count_hits(storage, hits):
+    for _ in range(hits):
+        storage.incr('shared', 60)
+
+
+def test_processes_share_the_counter(storage):
+    # opened by the parent before the fork, each child opens its own
+    storage.incr('shared', 60)
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=count_hits, args=(storage, 200)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    assert storage.get('shared') == 401
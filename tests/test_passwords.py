@@ -0,0 +1,91 @@
+""" A full password hashing queue is refused at once with 503 and
+Retry-After instead of holding the request thread """
+import threading
+import time
+
+import pytest
+from flask_jwt_extended import decode_token
+from passlib.hash import sha256_crypt
+
+from app.extensions import db
+from app.api.models.user import AppRoleModel, RoleModel, UserModel
+from app.api.utils.passwords import PasswordHasher, PasswordHashBusy, password_hasher
+
+
+def test_full_queue_is_refused_without_waiting():
+    hasher = PasswordHasher()
+    hasher.workers = 1
+    hasher.timeout = 10
+    release = threading.Event()
+    # one running call and three waiting fill the four slots of a worker
+    callers = [
+        threading.Thread(target=hasher._run, args=(release.wait,), daemon=True) for _ in range(4)
+    ]
+    for caller in callers:
+        caller.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    with pytest.raises(PasswordHashBusy):
+        hasher._run(release.wait)
+    assert time.monotonic() - start < 1
+
+    release.set()
+    for caller in callers:
+        caller.join(5)
+    assert hasher._run(lambda: 'hashed') == 'hashed'
+
+
+@pytest.fixture
+def busy_hasher(monkeypatch):
+    def busy(*args):
+        raise PasswordHashBusy('too many passwords waiting to be hashed')
+
+    monkeypatch.setattr(password_hasher, '_run', busy)
+
+
+def test_create_user_answers_503_when_hashing_is_busy(client, busy_hasher):
+    response = client.post('/api/users/', json={
+        'name': 'New User', 'email': 'new@example.com', 'password': 'secret1'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_update_password_answers_503_when_hashing_is_busy(client, admin_headers, busy_hasher):
+    response = client.post('/api/users/me/update_password', headers=admin_headers, json={
+        'old_password': 'password', 'new_password': 'secret1'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def login(client, email):
+    response = client.post('/api/auth/login', json={'email': email, 'password': 'secret1'})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+
+def test_login_upgrades_a_legacy_hash_without_reloading_the_user(client):
+    app_role = AppRoleModel(name='words')
+    db.session.add(app_role)
+    db.session.flush()
+    role = RoleModel(name='create_word', app_id=app_role.id)
+    db.session.add_all([
+        UserModel(name='Current User', email='current@example.com',
+                  password=UserModel.hash_password('secret1'), roles=[role]),
+        UserModel(name='Legacy User', email='legacy@example.com',
+                  password=sha256_crypt.hash('secret1', rounds=1000), roles=[role]),
+    ])
+    db.session.commit()
+
+    current_count = int(login(client, 'current@example.com').headers['X-Query-Count'])
+    response = login(client, 'legacy@example.com')
+
+    # only the UPDATE of the hash, the user and its roles are not read again
+    assert int(response.headers['X-Query-Count']) == current_count + 1
+    assert decode_token(response.json['access_token'])['roles'] == ['create_word']
+    db.session.remove()
+    user = UserModel.get_user_by_email('legacy@example.com')
+    assert user.password.startswith('$6$')
+    assert user.check_password('secret1')
@@ -0,0 +1,41 @@
+""" Count arguments of the query string are rejected with 400 the same way
+on every endpoint instead of being clamped """
+import pytest
+
+
+BAD_LIMITS = ['0', '-1', 'ten', '1001']
+
+
+@pytest.mark.parametrize('url', [
+    '/api/words/?limit={}',
+    '/api/words/search?q=word&limit={}',
+    '/api/dashboard/top10_wrong_words_by_user?limit={}',
+    '/api/dashboard/summary?limit={}',
+    '/api/dashboard/due?limit={}',
+])
+@pytest.mark.parametrize('value', BAD_LIMITS)
+def test_bad_limit_is_rejected(client, admin_headers, url, value):
+    response = client.get(url.format(value), headers=admin_headers)
+    assert response.status_code == 400
+    assert 'limit' in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/tags/1/sample?n={}',
+    '/api/set_words/1/sample?n={}',
+])
+@pytest.mark.parametrize('value', ['0', '-1', 'ten', '101'])
+def test_bad_sample_size_is_rejected(client, admin_headers, url, value):
+    response = client.get(url.format(value), headers=admin_headers)
+    assert response.status_code == 400
+    assert '"n"' in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/dashboard/top10_wrong_words_by_user?limit=5',
+    '/api/dashboard/due?limit=100',
+    '/api/words/?limit=1000',
+    '/api/words/search?q=word&limit=50',
+])
+def test_limit_in_range_is_accepted(client, admin_headers, url):
+    assert client.get(url, headers=admin_headers).status_code == 200
@@ -0,0 +1,73 @@
+""" SQL statements per request of the list and detail endpoints, counted
+by the query budget of ConfigTest (X-Query-Count). The count must stay
+the same when the rows and their relationships grow """
+import pytest
+
+from app.extensions import db
+from app.api.models.user import UserModel, RoleModel, AppRoleModel
+from app.api.models.word import TagModel, WordModel, SetModel
+
+
+URLS = [
+    '/api/words/',
+    '/api/words/1',
+    '/api/tags/',
+    '/api/tags/1',
+    '/api/set_words/',
+    '/api/set_words/1',
+    '/api/set_words/words/1',
+    '/api/users/',
+    '/api/users/1',
+]
+
+
+def add_catalogue(count):
+    """ count tags, words, users and roles, the new words and tags are also
+    added to the first set and word so the detail endpoints grow too """
+    batch = db.session.query(TagModel).count()
+    app_role = db.session.query(AppRoleModel).first()
+    if app_role is None:
+        app_role = AppRoleModel(name='words')
+        db.session.add(app_role)
+        db.session.flush()
+    tags = [TagModel(name=f'tag {batch + index}') for index in range(count)]
+    roles = [RoleModel(name=f'role {batch + index}', app_id=app_role.id) for index in range(count)]
+    words = [
+        WordModel(name=f'word {batch + index}', translation='translation', tags=tags[:2])
+        for index in range(count)
+    ]
+    users = [
+        UserModel(name=f'user {batch + index}', email=f'user{batch + index}@example.com',
+                  password='hash', roles=roles[:2])
+        for index in range(count)
+    ]
+    db.session.add_all(tags + roles + words + users)
+    db.session.add(SetModel(name=f'set {batch}', words=words))
+
+    first_word = db.session.get(WordModel, 1)
+    first_word.tags.extend(tags)
+    first_set = db.session.get(SetModel, 1)
+    first_set.words.extend(words)
+    db.session.get(UserModel, 1).roles.extend(roles)
+    db.session.commit()
+
+
+def query_count(client, url, headers):
+    # the first request after a commit may read the token epoch of the user again
+    client.get(url, headers=headers)
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return int(response.headers['X-Query-Count'])
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_statement_count_does_not_grow_with_rows(app, client, admin_headers, url):
+    assert app.config['SQLALCHEMY_QUERY_BUDGET']
+    add_catalogue(3)
+    few = query_count(client, url, admin_headers)
+
+    add_catalogue(20)
+    many = query_count(client, url, admin_headers)
+
+    assert few == many
+    assert many <= app.config['SQLALCHEMY_QUERY_BUDGET']
@@ -0,0 +1,121 @@
+""" Query plans of the dashboard queries. Each one must read an index and
+never scan history_hits, on SQLite through EXPLAIN QUERY PLAN and on
+PostgreSQL (TEST_DATABASE_URI) through EXPLAIN with sequential scans
+disabled, so a small test table cannot hide a missing index """
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.api.models.word import (
+    WordModel, HistoricHitsModel, UserDailyStatsModel, UserWordStatsModel, ReviewScheduleModel,
+)
+from app.api.utils.date_window import get_date_window
+
+
+HISTORY_INDEX = 'ix_history_hits_id_user_date_hit'
+# tables read by the dashboard, a full scan of any of them grows with every user
+DASHBOARD_TABLES = ('history_hits', 'user_daily_stats', 'user_word_stats', 'review_schedules')
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+
+def explain(statement, parameters):
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in rows]
+    connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    rows = connection.exec_driver_sql('EXPLAIN ' + statement, parameters)
+    return [row[0] for row in rows]
+
+
+def full_scans(plan):
+    """ Dashboard tables read from end to end in the plan """
+    scans = set()
+    for line in plan:
+        for table in DASHBOARD_TABLES:
+            if re.search(rf'^SCAN (TABLE )?{table}\b|Seq Scan on {table}\b', line.strip()):
+                scans.add(table)
+    return scans
+
+
+def plans_of(fn):
+    """ Plans of the statements that fn runs on the dashboard tables """
+    with captured_statements() as statements:
+        fn()
+    plans = [
+        explain(statement, parameters)
+        for statement, parameters in statements
+        if any(table in statement for table in DASHBOARD_TABLES)
+    ]
+    assert plans
+    return plans
+
+
+@pytest.fixture
+def history(admin):
+    words = [WordModel(name=f'word {index}', translation='translation') for index in range(3)]
+    db.session.add_all(words)
+    db.session.commit()
+    today = get_date_window().today
+    historics = [
+        {'id_user': admin.id, 'id_word': word.id, 'hit': index % 2 == 0,
+         'date': today - timedelta(days=index)}
+        for index, word in enumerate(words * 4)
+    ]
+    HistoricHitsModel.bulk_create_historics(historics)
+    return admin.id
+
+
+DASHBOARD_QUERIES = {
+    'total_hits_last_30days': lambda id_user: HistoricHitsModel.get_historic_hits_by_user(id_user),
+    'historic_by_day': lambda id_user: HistoricHitsModel.get_historic_by_day_by_user(
+        id_user, get_date_window().yesterday),
+    'top10_wrong_words': lambda id_user: HistoricHitsModel.get_historic_by_user_top10_words_error(id_user),
+    'historic_90days': lambda id_user: HistoricHitsModel.get_historic_90days_by_user(id_user),
+    'summary': lambda id_user: HistoricHitsModel.get_dashboard_summary(
+        id_user, get_date_window().yesterday),
+    'due': lambda id_user: ReviewScheduleModel.get_due_words(id_user, 20),
+}
+
+
+@pytest.mark.parametrize('name', DASHBOARD_QUERIES)
+def test_dashboard_query_reads_an_index(history, name):
+    for plan in plans_of(lambda: DASHBOARD_QUERIES[name](history)):
+        assert not full_scans(plan), plan
+        assert any('SEARCH' in line or 'Index' in line for line in plan), plan
+
+
+USER_HISTORY_QUERIES = {
+    'export': lambda id_user: list(HistoricHitsModel.iter_historics_by_user(id_user)),
+    'rebuild_daily_stats': lambda id_user: UserDailyStatsModel.rebuild(id_user),
+    'rebuild_word_stats': lambda id_user: UserWordStatsModel.rebuild(id_user),
+}
+
+
+@pytest.mark.parametrize('name', USER_HISTORY_QUERIES)
+def test_user_history_query_uses_the_history_index(history, name):
+    plans = [
+        plan for plan in plans_of(lambda: USER_HISTORY_QUERIES[name](history))
+        if any('history_hits' in line for line in plan)
+    ]
+    assert plans
+    for plan in plans:
+        assert 'history_hits' not in full_scans(plan), plan
+        assert any(HISTORY_INDEX in line for line in plan), plan
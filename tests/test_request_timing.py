@@ -0,0 +1,34 @@
+""" Server-Timing header of the requests with SERVER_TIMING enabled """
+import re
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+
+
+@pytest.fixture
+def app_config():
+    return {'SERVER_TIMING': True}
+
+
+def test_server_timing_header(client, admin_headers):
+    response = client.get('/api/words/', headers=admin_headers)
+
+    assert response.status_code == 200
+    timing = dict(
+        re.match(r'(\w+);dur=([\d.]+)', metric.strip()).groups()
+        for metric in response.headers['Server-Timing'].split(',')
+    )
+    assert set(timing) == {'db', 'serialize', 'handler', 'total'}
+    assert float(timing['total']) >= float(timing['db'])
+    queries = int(response.headers['X-Query-Count'])
+    assert f'desc="{queries} queries"' in response.headers['Server-Timing']
+
+
+def test_failed_statements_leave_nothing_on_the_connection(app):
+    with db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql('SELECT * FROM missing_table')
+        assert not connection.info.get('query_start')
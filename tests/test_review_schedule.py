@@ -0,0 +1,119 @@
+""" SM-2 schedule of the answers, replayed incrementally on each submit
+and by the rebuild command """
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.api.models.word import (
+    HistoricHitsModel, ReviewScheduleModel, WordModel, SM2_INITIAL_EASE, SM2_MAX_INTERVAL
+)
+from app.api.utils.date_window import get_date_window
+
+
+DAY = date(2024, 1, 1)
+
+
+def answer(state, hit, answered_at, key=(1, 1)):
+    states = {key: state} if state else {}
+    row, = ReviewScheduleModel._apply_reviews(
+        states, [{'id_user': key[0], 'id_word': key[1], 'hit': hit, 'date': answered_at}]
+    )
+    return row
+
+
+def test_long_run_of_hits_on_due_dates_stops_at_the_maximum_interval():
+    state, answered_at = None, DAY
+    for _ in range(60):
+        row = answer(state, True, answered_at)
+        state = (row['repetitions'], row['interval'], row['ease'], row['due_at'])
+        answered_at = row['due_at']
+
+    assert row['repetitions'] == 60
+    assert row['interval'] == SM2_MAX_INTERVAL
+    assert row['due_at'] == row['last_review'] + timedelta(days=SM2_MAX_INTERVAL)
+
+
+def test_hits_before_the_due_date_keep_the_schedule():
+    historics = [{'id_user': 1, 'id_word': 1, 'hit': True, 'date': DAY} for _ in range(30)]
+    historics.append({'id_user': 1, 'id_word': 1, 'hit': True, 'date': DAY + timedelta(days=1)})
+
+    row, = ReviewScheduleModel._apply_reviews({}, historics)
+
+    # the first hit of each day moves the word, the others come early
+    assert (row['repetitions'], row['interval']) == (2, 6)
+    assert row['due_at'] == DAY + timedelta(days=7)
+    assert row['last_review'] == DAY + timedelta(days=1)
+
+
+def test_early_hit_only_records_the_review():
+    row = answer((3, 15, SM2_INITIAL_EASE, DAY + timedelta(days=15)), True, DAY + timedelta(days=4))
+
+    assert (row['repetitions'], row['interval'], row['ease']) == (3, 15, SM2_INITIAL_EASE)
+    assert row['due_at'] == DAY + timedelta(days=15)
+    assert row['last_review'] == DAY + timedelta(days=4)
+
+
+def test_error_restarts_the_word_even_before_it_is_due():
+    row = answer((5, 120, SM2_INITIAL_EASE, DAY + timedelta(days=120)), False, DAY + timedelta(days=4))
+
+    assert (row['repetitions'], row['interval']) == (0, 0)
+    assert row['ease'] < SM2_INITIAL_EASE
+    assert row['due_at'] == DAY + timedelta(days=4)
+
+
+def test_repeated_hits_through_the_api_keep_working(client, admin, admin_headers):
+    word = WordModel(name='word', translation='translation')
+    db.session.add(word)
+    db.session.commit()
+
+    for _ in range(20):
+        response = client.post('/api/dashboard/create_historic', headers=admin_headers,
+                               json={'historics': [{'id_word': word.id, 'hit': True}]})
+        assert response.status_code == 201, response.get_data(as_text=True)
+
+    schedule = db.session.get(ReviewScheduleModel, (admin.id, word.id))
+    db.session.refresh(schedule)
+    assert (schedule.repetitions, schedule.interval) == (1, 1)
+
+
+def schedules():
+    db.session.remove()
+    return db.session.execute(
+        db.select(ReviewScheduleModel.id_word, ReviewScheduleModel.repetitions,
+                  ReviewScheduleModel.interval, ReviewScheduleModel.ease,
+                  ReviewScheduleModel.due_at, ReviewScheduleModel.last_review)
+        .order_by(ReviewScheduleModel.id_word)
+    ).all()
+
+
+def test_due_queue_and_rebuild_match_the_incremental_schedules(app, client, admin, admin_headers):
+    words = [WordModel(name=f'word {index}', translation='translation') for index in range(8)]
+    db.session.add_all(words)
+    db.session.commit()
+    word_ids = [word.id for word in words]
+    today = get_date_window().today
+
+    # (word, days ago, hit), submitted day by day as the users answer
+    answers = [(0, 10, True), (1, 9, True), (2, 8, True), (3, 7, True), (4, 6, True)]
+    answers += [(5, 20, True), (5, 19, True), (5, 15, True), (6, 0, True)]
+    answers += [(7, 3, True), (7, 2, False), (7, 2, True), (7, 2, True)]
+    for days_ago in sorted({days_ago for _, days_ago, _ in answers}, reverse=True):
+        HistoricHitsModel.bulk_create_historics([
+            {'id_user': admin.id, 'id_word': word_ids[index], 'hit': hit,
+             'date': today - timedelta(days=days_ago)}
+            for index, ago, hit in answers if ago == days_ago
+        ])
+
+    incremental = schedules()
+    expected_due = [
+        row.id_word for row in sorted(incremental, key=lambda row: row.due_at) if row.due_at <= today
+    ]
+    response = client.get('/api/dashboard/due', headers=admin_headers)
+    assert response.status_code == 200
+    assert [row['id_word'] for row in response.json] == expected_due
+    assert word_ids[6] not in expected_due
+
+    result = app.test_cli_runner().invoke(args=['rebuild-review-schedules'])
+    assert 'Review schedules rebuilt' in result.output
+    assert schedules() == incremental
@@ -0,0 +1,52 @@
+""" Only the users whose token epoch changed lose their cached epoch when
+the users table is written """
+import pytest
+
+from app.extensions import db
+from app.api.models.user import UserModel
+from app.api.utils.token_epochs import token_epochs
+
+
+@pytest.fixture
+def other(app):
+    user = UserModel(name='other user', email='other@example.com', password='hash')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def cached(user):
+    return user.id in token_epochs._epochs
+
+
+def test_updates_without_epoch_change_keep_the_cache(admin, other):
+    token_epochs.get_epoch(admin.id)
+    token_epochs.get_epoch(other.id)
+
+    # as a rehash on login or a profile edit do
+    admin.password = UserModel.hash_password('password')
+    db.session.commit()
+    UserModel.update_user(other.id, {'name': 'renamed user'})
+
+    assert cached(admin) and cached(other)
+
+
+def test_revoked_user_is_dropped_and_its_tokens_rejected_at_once(client, admin, admin_headers,
+                                                                 other):
+    assert client.get('/api/words/', headers=admin_headers).status_code == 200
+    token_epochs.get_epoch(other.id)
+
+    admin.revoke_tokens()
+    db.session.commit()
+
+    assert not cached(admin) and cached(other)
+    assert client.get('/api/words/', headers=admin_headers).status_code == 401
+
+
+def test_deleted_user_is_dropped(admin, other):
+    token_epochs.get_epoch(admin.id)
+    token_epochs.get_epoch(other.id)
+
+    UserModel.delete_user(other)
+
+    assert cached(admin) and not cached(other)
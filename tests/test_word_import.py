@@ -0,0 +1,107 @@
+""" Bulk word import through the API and the import-words command, invalid
+rows are reported by their position while the valid ones are inserted """
+import json
+from io import BytesIO
+
+import pytest
+
+from app.extensions import db
+from app.api.models.word import TagModel, WordModel
+
+
+CSV = (
+    'name,translation,annotation,tags\n'
+    'Gato,cat,,home\n'
+    'perro,dog,a pet,home|animal\n'
+    'gato,cat again,,\n'
+    'casa,house,,\n'
+    'pato,duck,,nope\n'
+    'vaca,,,\n'
+)
+
+EXPECTED_ERRORS = [
+    (3, 'gato', 'duplicated name in the import'),
+    (4, 'casa', 'this word already exists'),
+    (5, 'pato', 'Tags nope do not exist'),
+]
+
+
+@pytest.fixture
+def catalogue(app):
+    home = TagModel(name='home')
+    db.session.add_all([home, TagModel(name='animal'), WordModel(name='casa', translation='house')])
+    db.session.commit()
+    return home.id
+
+
+def json_rows(home_id):
+    return [
+        {'name': 'Gato', 'translation': 'cat', 'tags': ['home']},
+        {'name': 'perro', 'translation': 'dog', 'annotation': 'a pet', 'tags': [home_id, 'animal']},
+        {'name': 'gato', 'translation': 'cat again'},
+        {'name': 'casa', 'translation': 'house'},
+        {'name': 'pato', 'translation': 'duck', 'tags': ['nope']},
+        {'name': 'vaca'},
+    ]
+
+
+def assert_imported(report):
+    assert report['created'] == 2
+    errors = report['errors']
+    assert [(error['row'], error['name'], error['message']) for error in errors[:3]] == EXPECTED_ERRORS
+    assert errors[3]['row'] == 6 and 'translation' in errors[3]['message']
+    assert len(errors) == 4
+    assert_stored_words()
+
+
+def assert_stored_words():
+    db.session.remove()
+    words = {word.name: word for word in WordModel.query.all()}
+    assert set(words) == {'casa', 'gato', 'perro'}
+    assert [tag.name for tag in words['gato'].tags] == ['home']
+    assert sorted(tag.name for tag in words['perro'].tags) == ['animal', 'home']
+    assert words['perro'].annotation == 'a pet'
+
+
+def test_import_json_body(client, admin_headers, catalogue):
+    response = client.post('/api/words/import', headers=admin_headers,
+                           json={'words': json_rows(catalogue)})
+    assert response.status_code == 200
+    assert_imported(response.json)
+
+
+def test_import_csv_body(client, admin_headers, catalogue):
+    response = client.post('/api/words/import', headers=admin_headers,
+                           data=CSV, content_type='text/csv')
+    assert response.status_code == 200
+    assert_imported(response.json)
+
+
+def test_import_csv_upload(client, admin_headers, catalogue):
+    response = client.post('/api/words/import', headers=admin_headers,
+                           data={'file': (BytesIO(CSV.encode('utf-8-sig')), 'words.csv')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert_imported(response.json)
+
+
+def test_import_requires_a_list(client, admin_headers):
+    response = client.post('/api/words/import', headers=admin_headers, json={'words': 'gato'})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('file_name', ['words.csv', 'words.json'])
+def test_import_words_command(app, catalogue, tmp_path, file_name):
+    path = tmp_path / file_name
+    if file_name.endswith('.csv'):
+        path.write_text(CSV, encoding='utf-8')
+    else:
+        path.write_text(json.dumps({'words': json_rows(catalogue)}), encoding='utf-8')
+
+    result = app.test_cli_runner().invoke(args=['import-words', str(path)])
+
+    assert result.exit_code == 0, result.output
+    assert 'Row 3 (gato): duplicated name in the import' in result.output
+    assert 'Row 5 (pato): Tags nope do not exist' in result.output
+    assert result.output.endswith('2 words imported\n')
+    assert_stored_words()
@@ -0,0 +1,40 @@
+""" The search index is rebuilt in the background only when words change,
+the previous index answers meanwhile """
+import pytest
+
+from app.extensions import db
+from app.api.models.word import TagModel, WordModel
+from app.api.utils.word_search import WordSearch
+
+
+@pytest.fixture
+def search(app):
+    db.session.add(WordModel(name='casa', translation='house'))
+    db.session.commit()
+    search = WordSearch()
+    assert [word['name'] for word in search.search('cas', 10)] == ['casa']
+    return search
+
+
+def names(search, query):
+    return [word['name'] for word in search.search(query, 10)]
+
+
+def test_tag_writes_keep_the_index(search):
+    index = search.get_index()
+    db.session.add(TagModel(name='home'))
+    db.session.commit()
+
+    assert search.get_index() is index
+    assert search._rebuild is None
+
+
+def test_word_writes_swap_in_a_new_index_built_in_the_background(search):
+    db.session.add(WordModel(name='casaco', translation='coat'))
+    db.session.commit()
+
+    # the stale index answers while the new one is built
+    assert names(search, 'cas') == ['casa']
+    search._rebuild.join(5)
+    assert names(search, 'cas') == ['casa', 'casaco']
+    assert not search._rebuild.is_alive()